@@ -1,15 +1,22 @@
 import os
 import logging
 import asyncio
+import heapq
+import io
 import random
-from typing import Optional, Literal, Dict, List
+import re
+import sqlite3
+import time
+from typing import Any, Optional, Literal, Dict, List, Tuple, NamedTuple
 from datetime import datetime, timedelta
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 import json
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict, Counter
+from itertools import chain, islice
+from operator import itemgetter
 
 # Setup logging
 logging.basicConfig(
@@ -21,6 +28,78 @@ logger = logging.getLogger('discord_bot')
 # Load environment variables
 load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
+# Set CACHE_MEMBERS=false to skip the in-memory member list on large deployments;
+# member events still arrive, but features that scan guild.members see only the bot
+# (see README "Running Without a Member Cache") and single lookups fall back to the API
+CACHE_MEMBERS = os.getenv('CACHE_MEMBERS', 'true').lower() not in ('0', 'false', 'no')
+
+# Full user profiles (banner, accent color) are cached to skip repeat fetch_user calls
+USER_CACHE_TTL = 3600
+USER_CACHE_SIZE = 5_000
+
+# Log embeds bound for the same channel are batched into one message
+LOG_BATCH_SIZE = 10  # Discord's per-message embed limit
+LOG_BATCH_LINGER = 0.2  # Seconds to wait for more embeds before flushing
+EMBED_TOTAL_LIMIT = 6000  # Combined character limit across a message's embeds
+
+# Ban audit entries pushed over the gateway are kept briefly for the ban log
+AUDIT_CACHE_TTL = 60
+
+# Concurrent REST calls per mass action; discord.py still paces each route's bucket
+MASS_ACTION_CONCURRENCY = 10
+# Due reminders and scheduled messages delivered at once
+TIMER_DELIVERY_CONCURRENCY = 20
+# /massban is self-paced to this many bans per window so bursts never hit a 429
+BAN_RATE = 5
+BAN_RATE_PERIOD = 5.0
+
+# Channel template type values, as stored by /savetemplate
+_TEXT_TYPE = discord.ChannelType.text.value
+_VOICE_TYPES = frozenset((discord.ChannelType.voice.value, discord.ChannelType.stage_voice.value))
+
+# Leveling and economy state is written behind to SQLite on this interval (seconds)
+DATA_DB = 'data.db'
+DATA_FLUSH_INTERVAL = 60
+
+# Seconds to stop posting level-up replies in a channel after one fails
+LEVELUP_BACKOFF = 60
+
+# Discord caps a message at this many distinct reactions
+MAX_REACTIONS = 20
+# A role given as a mention or raw ID in /reactionrole_bulk
+_ROLE_REF_RE = re.compile(r'<@&(\d+)>|(\d{15,20})')
+
+# Leaderboard rows are reused while their board is unchanged, and at most this long
+# so members joining or leaving a guild are picked up
+LEADERBOARD_CACHE_TTL = 30
+
+# Reaction-role changes for one member within this window collapse to their net change
+RR_COALESCE_WINDOW = 0.25
+RR_WORKERS = 3
+
+# Discord allows each channel two renames per ten minutes
+STATS_RENAME_LIMIT = 2
+STATS_RENAME_WINDOW = 600
+
+# Star counts tracked for messages not yet on the starboard
+STAR_COUNT_CACHE_SIZE = 10_000
+# Posted messages remembered for starboard dedup; older ones are forgotten first
+STARBOARD_HISTORY_SIZE = 10_000
+
+# Bound once; the XP listener and /daily call this without the module lookup
+_randint = random.randint
+
+# Shared embed colors
+_COLOR_BLUE = discord.Color.blue()
+_COLOR_BLURPLE = discord.Color.blurple()
+_COLOR_DARK_RED = discord.Color.dark_red()
+_COLOR_DEFAULT = discord.Color.default()
+_COLOR_GOLD = discord.Color.gold()
+_COLOR_GREEN = discord.Color.green()
+_COLOR_ORANGE = discord.Color.orange()
+_COLOR_PURPLE = discord.Color.purple()
+_COLOR_RED = discord.Color.red()
+_COLOR_YELLOW = discord.Color.yellow()
 
 class ModernBot(commands.Bot):
     """Modern Discord bot with slash commands and cogs."""
@@ -37,17 +116,26 @@ class ModernBot(commands.Bot):
         super().__init__(
             command_prefix='!',
             intents=intents,
-            help_command=None  # We'll create a custom one
+            help_command=None,  # We'll create a custom one
+            member_cache_flags=discord.MemberCacheFlags.from_intents(intents) if CACHE_MEMBERS else discord.MemberCacheFlags.none(),
+            chunk_guilds_at_startup=CACHE_MEMBERS
         )
+        self.cache_members = CACHE_MEMBERS
         
         # Tracking data
         self.log_channels: Dict[int, Dict[str, int]] = {}  # guild_id: {event_type: channel_id}
-        self.user_activity: Dict[int, Dict] = defaultdict(lambda: {
-            'messages': 0,
-            'voice_time': 0,
-            'joins': 0,
-            'leaves': 0
-        })
+        self.guild_settings: Dict[int, Dict[str, Any]] = {}  # guild_id: settings saved from the dashboard
+        # Activity counters keyed by user_id; reading a missing user never inserts
+        self.msg_counts: Counter[int] = Counter()
+        self.voice_time: Counter[int] = Counter()
+        self.join_counts: Counter[int] = Counter()
+        self.leave_counts: Counter[int] = Counter()
+        self._join_positions: Dict[int, Dict[int, int]] = {}  # guild_id: {member_id: join index}, in join order
+        self._join_stale: set[int] = set()  # Guilds whose join indexes have gaps left by leaves
+        self._log_channel_cache: Dict[Tuple[int, str], discord.abc.Messageable] = {}  # (guild_id, event_type): channel
+        self._save_event = asyncio.Event()
+        self._user_full_cache: OrderedDict[int, Tuple[float, discord.User]] = OrderedDict()
+        self.command_count = 0  # Top-level slash commands, counted once the cogs are loaded
         self.load_config()
     
     def load_config(self) -> None:
@@ -56,13 +144,36 @@ class ModernBot(commands.Bot):
             with open('config.json', 'r') as f:
                 data = json.load(f)
                 self.log_channels = {int(k): v for k, v in data.get('log_channels', {}).items()}
+                self.guild_settings = {int(k): v for k, v in data.get('guild_settings', {}).items()}
         except FileNotFoundError:
             self.log_channels = {}
+            self.guild_settings = {}
     
     def save_config(self) -> None:
-        """Save configuration to file."""
-        with open('config.json', 'w') as f:
-            json.dump({'log_channels': self.log_channels}, f, indent=2)
+        """Mark the config dirty; the flush loop coalesces writes."""
+        self._save_event.set()
+    
+    def _dump_config(self) -> str:
+        """Serialize the persisted configuration."""
+        return json.dumps({'log_channels': self.log_channels, 'guild_settings': self.guild_settings}, indent=2)
+    
+    def _write_config_sync(self, data: str) -> None:
+        """Write serialized configuration to disk."""
+        # Write to a temp file and swap it in so a crash never leaves a truncated config
+        with open('config.json.tmp', 'w') as f:
+            f.write(data)
+        os.replace('config.json.tmp', 'config.json')
+    
+    @tasks.loop(seconds=2)
+    async def flush_config(self) -> None:
+        """Persist pending config changes off the event loop."""
+        if not self._save_event.is_set():
+            return
+        self._save_event.clear()
+        try:
+            await asyncio.to_thread(self._write_config_sync, self._dump_config())
+        except OSError as e:
+            logger.error(f"Failed to save config: {e}")
     
     async def setup_hook(self) -> None:
         """Called when the bot is starting up."""
@@ -78,11 +189,89 @@ class ModernBot(commands.Bot):
         await self.add_cog(ChannelManagementCog(self))
         await self.add_cog(InsaneFeaturesCog(self))
         
+        # Role menu buttons stay clickable across restarts
+        self.add_dynamic_items(RoleButton)
+        self.flush_config.start()
+        self.command_count = len(self.tree.get_commands())
+        
         # Sync commands globally (or to specific guild for testing)
         logger.info("Syncing command tree...")
         await self.tree.sync()
         logger.info("Command tree synced!")
     
+    def get_join_position(self, member: discord.Member) -> Optional[int]:
+        """Get a member's 1-based join position, indexing the guild on first use."""
+        if not self.cache_members:
+            return None  # Needs the full member list to rank joins
+        positions = self._join_positions.get(member.guild.id)
+        if positions is None:
+            now = discord.utils.utcnow()
+            ordered = sorted(member.guild.members, key=lambda m: m.joined_at or now)
+            positions = self._join_positions[member.guild.id] = {m.id: i for i, m in enumerate(ordered)}
+        elif member.guild.id in self._join_stale:
+            # The dict is still in join order, so closing the gaps needs no re-sort
+            self._join_stale.discard(member.guild.id)
+            for i, member_id in enumerate(positions):
+                positions[member_id] = i
+        
+        position = positions.get(member.id)
+        if position is None:
+            position = positions[member.id] = len(positions)
+        return position + 1
+    
+    def get_log_channel(self, guild_id: int, event_type: str) -> Optional[discord.abc.Messageable]:
+        """Resolve the log channel for an event type, caching the channel object."""
+        key = (guild_id, event_type)
+        channel = self._log_channel_cache.get(key)
+        if channel is None:
+            log_config = self.log_channels.get(guild_id)
+            if not log_config:
+                return None
+            
+            channel_id = log_config.get(event_type) or log_config.get('all')
+            channel = self.get_channel(channel_id) if channel_id else None
+            if channel is not None:
+                self._log_channel_cache[key] = channel
+        return channel
+    
+    def invalidate_log_channels(self, guild_id: int) -> None:
+        """Forget resolved log channels for a guild after its log config changes."""
+        for key in [key for key in self._log_channel_cache if key[0] == guild_id]:
+            del self._log_channel_cache[key]
+    
+    async def fetch_full_user(self, user_id: int) -> discord.User:
+        """Fetch a user's full profile, served from cache while fresh."""
+        cached = self._user_full_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < USER_CACHE_TTL:
+            return cached[1]
+        
+        user = await self.fetch_user(user_id)
+        self._user_full_cache[user_id] = (time.monotonic(), user)
+        self._user_full_cache.move_to_end(user_id)
+        while len(self._user_full_cache) > USER_CACHE_SIZE:
+            self._user_full_cache.popitem(last=False)
+        return user
+    
+    async def on_member_join(self, member: discord.Member) -> None:
+        """Append new members to the join index."""
+        positions = self._join_positions.get(member.guild.id)
+        if positions is not None:
+            positions.setdefault(member.id, len(positions))
+    
+    async def on_member_remove(self, member: discord.Member) -> None:
+        """Remove a leaving member from the join index; later positions are renumbered on the next lookup."""
+        positions = self._join_positions.get(member.guild.id)
+        if positions is not None and positions.pop(member.id, None) is not None:
+            self._join_stale.add(member.guild.id)
+    
+    async def close(self) -> None:
+        """Flush any pending config write before shutting down."""
+        self.flush_config.cancel()
+        if self._save_event.is_set():
+            self._save_event.clear()
+            self._write_config_sync(self._dump_config())
+        await super().close()
+    
     async def on_ready(self) -> None:
         """Called when bot is ready."""
         logger.info(f'Logged in as {self.user} (ID: {self.user.id})')
@@ -97,6 +286,100 @@ class ModernBot(commands.Bot):
             )
         )
 
+# (bit, display name) for every permission flag, decoded against Permissions.value
+_PERM_TABLE: List[Tuple[int, str]] = [
+    (getattr(discord.Permissions, name).flag, name.replace('_', ' ').title())
+    for name, _ in discord.Permissions.all()
+]
+
+# Permissions highlighted in the userinfo "Key Permissions" field
+_KEY_PERMS: List[Tuple[int, str]] = [
+    (discord.Permissions.administrator.flag, "👑 Administrator"),
+    (discord.Permissions.manage_guild.flag, "⚙️ Manage Server"),
+    (discord.Permissions.manage_roles.flag, "🎭 Manage Roles"),
+    (discord.Permissions.manage_channels.flag, "📝 Manage Channels"),
+    (discord.Permissions.kick_members.flag, "🥾 Kick Members"),
+    (discord.Permissions.ban_members.flag, "🔨 Ban Members"),
+    (discord.Permissions.manage_messages.flag, "🗑️ Manage Messages"),
+    (discord.Permissions.mention_everyone.flag, "📢 Mention Everyone"),
+    (discord.Permissions.manage_webhooks.flag, "🪝 Manage Webhooks")
+]
+
+# Badge labels for public user flags shown in userinfo
+_FLAG_MAPPING: Dict[str, str] = {
+    'staff': '🛡️ Discord Staff',
+    'partner': '🤝 Partnered Server Owner',
+    'hypesquad': '⚡ HypeSquad Events',
+    'bug_hunter': '🐛 Bug Hunter',
+    'hypesquad_bravery': '🟣 HypeSquad Bravery',
+    'hypesquad_brilliance': '🔴 HypeSquad Brilliance',
+    'hypesquad_balance': '🟢 HypeSquad Balance',
+    'early_supporter': '⭐ Early Supporter',
+    'bug_hunter_level_2': '🐛 Bug Hunter Level 2',
+    'verified_bot_developer': '✅ Early Verified Bot Developer',
+    'verified_bot': '✅ Verified Bot',
+    'discord_certified_moderator': '🔨 Discord Certified Moderator',
+    'bot_http_interactions': '🔗 HTTP Interactions Bot',
+    'active_developer': '⚙️ Active Developer'
+}
+
+# (bit, badge) decoded against PublicUserFlags.value
+_FLAG_TABLE: List[Tuple[int, str]] = [
+    (discord.PublicUserFlags.VALID_FLAGS[name], label)
+    for name, label in _FLAG_MAPPING.items()
+    if name in discord.PublicUserFlags.VALID_FLAGS
+]
+
+# Status labels keyed by the Status enum itself
+_STATUS_EMOJIS = {
+    discord.Status.online: '🟢 Online',
+    discord.Status.idle: '🟡 Idle',
+    discord.Status.dnd: '🔴 Do Not Disturb',
+    discord.Status.offline: '⚫ Offline/Invisible'
+}
+
+# Field order and labels for the /activity status breakdown
+_ACTIVITY_STATUS_FIELDS = (
+    (discord.Status.online, "🟢 Online"),
+    (discord.Status.idle, "🟡 Idle"),
+    (discord.Status.dnd, "🔴 DND"),
+    (discord.Status.offline, "⚫ Offline"),
+)
+
+# Activity formatters keyed by exact activity type
+_ACTIVITY_FORMATTERS = {
+    discord.Spotify: lambda a: f"**🎵 Spotify:** {a.title} by {a.artist}",
+    discord.Game: lambda a: f"**🎮 Playing:** {a.name}",
+    discord.Streaming: lambda a: f"**📹 Streaming:** {a.name}",
+    discord.CustomActivity: lambda a: f"**💭 Custom:** {f'{a.emoji} ' if a.emoji else ''}{a.name or 'No status'}"
+}
+
+# Full-width bar sliced for the text charts in membercount/activity
+BAR20 = "█" * 20
+
+def _bar(count: int, total: int) -> str:
+    """Render count/total as a bar of up to 20 blocks."""
+    return BAR20[:count * 20 // total] if total else ""
+
+# /rank progress bars, indexed by filled blocks out of 20
+_PROGRESS_BARS = tuple("█" * i + "░" * (20 - i) for i in range(21))
+
+# Leaderboard rank labels, and the key for its (user_id, score) rows
+_MEDALS = ("🥇", "🥈", "🥉") + tuple(f"#{i}" for i in range(4, 11))
+_SCORE = itemgetter(1)
+
+def _pct(count: int, total: int) -> float:
+    """Get count as a percentage of total, 0 when total is 0."""
+    return count * 100 / total if total else 0.0
+
+# Download links offered for avatars, as (label, file extension)
+_STATIC_LINK_FORMATS = (('PNG', 'png'), ('WebP', 'webp'), ('JPG', 'jpg'))
+_ANIMATED_LINK_FORMATS = _STATIC_LINK_FORMATS + (('GIF', 'gif'),)
+
+def _asset_stem(asset: discord.Asset) -> str:
+    """Get an asset's CDN URL without extension or query, for building format/size variants."""
+    return asset.url.split('?', 1)[0].rsplit('.', 1)[0]
+
 class UserInfoView(discord.ui.View):
     """Interactive view with buttons for user info."""
     
@@ -107,12 +390,13 @@ class UserInfoView(discord.ui.View):
     @discord.ui.button(label="Show Permissions", style=discord.ButtonStyle.primary, emoji="🔐")
     async def show_permissions(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
         """Show detailed permissions."""
-        permissions = [perm[0].replace('_', ' ').title() for perm in self.member.guild_permissions if perm[1]]
+        value = self.member.guild_permissions.value
+        permissions = [name for bit, name in _PERM_TABLE if value & bit]
         
         embed = discord.Embed(
             title=f"Permissions for {self.member.display_name}",
             description='\n'.join(f"✅ {perm}" for perm in permissions[:20]),
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         
         if len(permissions) > 20:
@@ -126,7 +410,7 @@ class UserInfoView(discord.ui.View):
         avatar_url = self.member.display_avatar.url
         embed = discord.Embed(
             title=f"{self.member.display_name}'s Avatar",
-            color=discord.Color.blurple()
+            color=_COLOR_BLURPLE
         )
         embed.set_image(url=avatar_url)
         await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -144,24 +428,27 @@ class UserInfoCog(commands.Cog):
         await interaction.response.defer()  # This might take a moment
         
         member = member or interaction.user
+        now = discord.utils.utcnow()
         
         # Fetch full user data (includes banner, accent color, etc.)
         try:
-            user = await self.bot.fetch_user(member.id)
-        except:
+            user = await self.bot.fetch_full_user(member.id)
+        except discord.HTTPException:
             user = member
+        join_position = self.bot.get_join_position(member)
         
         # Create main embed with maximum info
-        roles = [role.mention for role in member.roles if role.name != '@everyone']
+        role_count = len(member.roles) - 1  # Minus @everyone
+        roles = list(islice((role.mention for role in member.roles if not role.is_default()), 15))
         
         # Color priority: accent color > role color > default
-        color = user.accent_color or member.color if member.color != discord.Color.default() else discord.Color.blue()
+        color = user.accent_color or member.color if member.color != _COLOR_DEFAULT else _COLOR_BLUE
         
         embed = discord.Embed(
             title="📊 Complete User Analysis",
             description=f"**Full profile data for {member.mention}**",
             color=color,
-            timestamp=discord.utils.utcnow()
+            timestamp=now
         )
         
         # Banner if available
@@ -172,171 +459,110 @@ class UserInfoCog(commands.Cog):
         embed.set_thumbnail(url=member.display_avatar.url)
         
         # === IDENTITY SECTION ===
-        identity_info = []
-        identity_info.append(f"**Display Name:** {member.display_name}")
-        identity_info.append(f"**Username:** {member.name}")
-        if member.nick:
-            identity_info.append(f"**Nickname:** {member.nick}")
-        identity_info.append(f"**User ID:** `{member.id}`")
-        if member.discriminator != "0":
-            identity_info.append(f"**Discriminator:** #{member.discriminator}")
-        identity_info.append(f"**Mention:** {member.mention}")
-        embed.add_field(name="🪪 Identity", value='\n'.join(identity_info), inline=False)
+        identity_info = (
+            f"**Display Name:** {member.display_name}\n"
+            f"**Username:** {member.name}\n"
+            + (f"**Nickname:** {member.nick}\n" if member.nick else "")
+            + f"**User ID:** `{member.id}`\n"
+            + (f"**Discriminator:** #{member.discriminator}\n" if member.discriminator != "0" else "")
+            + f"**Mention:** {member.mention}"
+        )
+        embed.add_field(name="🪪 Identity", value=identity_info, inline=False)
         
         # === USER TYPE & FLAGS ===
-        type_info = []
-        type_info.append(f"**Bot Account:** {'✅ Yes' if member.bot else '❌ No'}")
-        type_info.append(f"**System Account:** {'✅ Yes' if member.system else '❌ No'}")
-        
         # User badges/flags
         flags = []
         if user.public_flags:
-            flag_mapping = {
-                'staff': '🛡️ Discord Staff',
-                'partner': '🤝 Partnered Server Owner',
-                'hypesquad': '⚡ HypeSquad Events',
-                'bug_hunter': '🐛 Bug Hunter',
-                'hypesquad_bravery': '🟣 HypeSquad Bravery',
-                'hypesquad_brilliance': '🔴 HypeSquad Brilliance',
-                'hypesquad_balance': '🟢 HypeSquad Balance',
-                'early_supporter': '⭐ Early Supporter',
-                'bug_hunter_level_2': '🐛 Bug Hunter Level 2',
-                'verified_bot_developer': '✅ Early Verified Bot Developer',
-                'verified_bot': '✅ Verified Bot',
-                'discord_certified_moderator': '🔨 Discord Certified Moderator',
-                'bot_http_interactions': '🔗 HTTP Interactions Bot',
-                'active_developer': '⚙️ Active Developer'
-            }
-            
-            for flag_name, display_name in flag_mapping.items():
-                if getattr(user.public_flags, flag_name, False):
-                    flags.append(display_name)
-        
-        if flags:
-            type_info.append(f"**Badges:** {', '.join(flags)}")
-        else:
-            type_info.append("**Badges:** None")
+            flags_value = user.public_flags.value
+            flags = [label for bit, label in _FLAG_TABLE if flags_value & bit]
         
-        embed.add_field(name="🏅 Type & Badges", value='\n'.join(type_info), inline=True)
+        type_info = (
+            f"**Bot Account:** {'✅ Yes' if member.bot else '❌ No'}\n"
+            f"**System Account:** {'✅ Yes' if member.system else '❌ No'}\n"
+            f"**Badges:** {', '.join(flags) if flags else 'None'}"
+        )
+        embed.add_field(name="🏅 Type & Badges", value=type_info, inline=True)
         
         # === STATUS & PRESENCE ===
-        status_info = []
-        status_emojis = {
-            'online': '🟢 Online',
-            'idle': '🟡 Idle',
-            'dnd': '🔴 Do Not Disturb',
-            'offline': '⚫ Offline/Invisible'
-        }
-        status_info.append(f"**Status:** {status_emojis.get(str(member.status), str(member.status))}")
+        status_info = [f"**Status:** {_STATUS_EMOJIS.get(member.status, str(member.status))}"]
         
         # Platform-specific status
-        if member.desktop_status != discord.Status.offline:
-            status_info.append(f"**Desktop:** {status_emojis.get(str(member.desktop_status), '🖥️')}")
-        if member.mobile_status != discord.Status.offline:
-            status_info.append(f"**Mobile:** {status_emojis.get(str(member.mobile_status), '📱')}")
-        if member.web_status != discord.Status.offline:
-            status_info.append(f"**Web:** {status_emojis.get(str(member.web_status), '🌐')}")
+        if member.desktop_status is not discord.Status.offline:
+            status_info.append(f"**Desktop:** {_STATUS_EMOJIS.get(member.desktop_status, '🖥️')}")
+        if member.mobile_status is not discord.Status.offline:
+            status_info.append(f"**Mobile:** {_STATUS_EMOJIS.get(member.mobile_status, '📱')}")
+        if member.web_status is not discord.Status.offline:
+            status_info.append(f"**Web:** {_STATUS_EMOJIS.get(member.web_status, '🌐')}")
         
         # Activities
         if member.activities:
             for activity in member.activities:
-                if isinstance(activity, discord.Spotify):
-                    status_info.append(f"**🎵 Spotify:** {activity.title} by {activity.artist}")
-                elif isinstance(activity, discord.Game):
-                    status_info.append(f"**🎮 Playing:** {activity.name}")
-                elif isinstance(activity, discord.Streaming):
-                    status_info.append(f"**📹 Streaming:** {activity.name}")
-                elif isinstance(activity, discord.CustomActivity):
-                    emoji = f"{activity.emoji} " if activity.emoji else ""
-                    status_info.append(f"**💭 Custom:** {emoji}{activity.name or 'No status'}")
-                else:
-                    status_info.append(f"**Activity:** {activity.name}")
+                formatter = _ACTIVITY_FORMATTERS.get(type(activity))
+                status_info.append(formatter(activity) if formatter else f"**Activity:** {activity.name}")
         else:
             status_info.append("**Activity:** None")
         
         embed.add_field(name="📡 Status & Presence", value='\n'.join(status_info), inline=True)
         
         # === VOICE STATE ===
-        if member.voice:
-            voice_info = []
-            voice_info.append(f"**Channel:** {member.voice.channel.mention}")
-            voice_info.append(f"**Muted:** {'✅' if member.voice.mute or member.voice.self_mute else '❌'}")
-            voice_info.append(f"**Deafened:** {'✅' if member.voice.deaf or member.voice.self_deaf else '❌'}")
-            voice_info.append(f"**Streaming:** {'✅' if member.voice.self_stream else '❌'}")
-            voice_info.append(f"**Video:** {'✅' if member.voice.self_video else '❌'}")
-            if member.voice.requested_to_speak_at:
-                voice_info.append(f"**Stage Request:** <t:{int(member.voice.requested_to_speak_at.timestamp())}:R>")
-            embed.add_field(name="🎙️ Voice State", value='\n'.join(voice_info), inline=False)
+        voice = member.voice
+        if voice:
+            voice_info = (
+                f"**Channel:** {voice.channel.mention}\n"
+                f"**Muted:** {'✅' if voice.mute or voice.self_mute else '❌'}\n"
+                f"**Deafened:** {'✅' if voice.deaf or voice.self_deaf else '❌'}\n"
+                f"**Streaming:** {'✅' if voice.self_stream else '❌'}\n"
+                f"**Video:** {'✅' if voice.self_video else '❌'}"
+            )
+            if voice.requested_to_speak_at:
+                voice_info += f"\n**Stage Request:** <t:{int(voice.requested_to_speak_at.timestamp())}:R>"
+            embed.add_field(name="🎙️ Voice State", value=voice_info, inline=False)
         
         # === ROLES ===
         embed.add_field(
-            name=f"🎭 Roles ({len(roles)})",
-            value=' '.join(roles[:15]) if roles else 'No roles',
+            name=f"🎭 Roles ({role_count})",
+            value=' '.join(roles) if roles else 'No roles',
             inline=False
         )
-        if len(roles) > 15:
-            embed.add_field(name="➕", value=f"... and {len(roles) - 15} more roles", inline=False)
+        if role_count > 15:
+            embed.add_field(name="➕", value=f"... and {role_count - 15} more roles", inline=False)
         
         # === PERMISSIONS ===
-        key_perms = []
-        if member.guild_permissions.administrator:
-            key_perms.append("👑 Administrator")
-        if member.guild_permissions.manage_guild:
-            key_perms.append("⚙️ Manage Server")
-        if member.guild_permissions.manage_roles:
-            key_perms.append("🎭 Manage Roles")
-        if member.guild_permissions.manage_channels:
-            key_perms.append("📝 Manage Channels")
-        if member.guild_permissions.kick_members:
-            key_perms.append("🥾 Kick Members")
-        if member.guild_permissions.ban_members:
-            key_perms.append("🔨 Ban Members")
-        if member.guild_permissions.manage_messages:
-            key_perms.append("🗑️ Manage Messages")
-        if member.guild_permissions.mention_everyone:
-            key_perms.append("📢 Mention Everyone")
-        if member.guild_permissions.manage_webhooks:
-            key_perms.append("🪝 Manage Webhooks")
+        perms_value = member.guild_permissions.value
+        key_perms = [label for bit, label in _KEY_PERMS if perms_value & bit]
         
         if key_perms:
             embed.add_field(name="🔐 Key Permissions", value='\n'.join(key_perms), inline=True)
         
         # === SERVER MEMBER INFO ===
-        server_info = []
-        server_info.append(f"**Joined Server:** <t:{int(member.joined_at.timestamp())}:F>")
-        server_info.append(f"**Join Position:** #{sorted(interaction.guild.members, key=lambda m: m.joined_at).index(member) + 1}")
-        if member.premium_since:
-            server_info.append(f"**Server Booster:** ✅ Since <t:{int(member.premium_since.timestamp())}:R>")
-        else:
-            server_info.append("**Server Booster:** ❌")
-        
-        if member.timed_out_until:
-            server_info.append(f"**⏰ Timed Out Until:** <t:{int(member.timed_out_until.timestamp())}:F>")
-        
-        server_info.append(f"**Pending Verification:** {'✅ Yes' if member.pending else '❌ No'}")
-        embed.add_field(name="🏰 Server Info", value='\n'.join(server_info), inline=True)
+        server_info = (
+            f"**Joined Server:** <t:{int(member.joined_at.timestamp())}:F>\n"
+            f"**Join Position:** {f'#{join_position}' if join_position else 'Unknown'}\n"
+            + (f"**Server Booster:** ✅ Since <t:{int(member.premium_since.timestamp())}:R>\n"
+               if member.premium_since else "**Server Booster:** ❌\n")
+            + (f"**⏰ Timed Out Until:** <t:{int(member.timed_out_until.timestamp())}:F>\n"
+               if member.timed_out_until else "")
+            + f"**Pending Verification:** {'✅ Yes' if member.pending else '❌ No'}"
+        )
+        embed.add_field(name="🏰 Server Info", value=server_info, inline=True)
         
         # === ACCOUNT INFO ===
-        account_info = []
-        account_info.append(f"**Created:** <t:{int(member.created_at.timestamp())}:F>")
-        account_age_days = (discord.utils.utcnow() - member.created_at).days
-        account_info.append(f"**Account Age:** {account_age_days} days ({account_age_days // 365} years)")
-        if user.accent_color:
-            account_info.append(f"**Accent Color:** `{str(user.accent_color)}`")
-        account_info.append(f"**Avatar URL:** [Click here]({member.display_avatar.url})")
-        if user.banner:
-            account_info.append(f"**Banner URL:** [Click here]({user.banner.url})")
-        
-        embed.add_field(name="📅 Account Info", value='\n'.join(account_info), inline=True)
+        account_age_days = (now - member.created_at).days
+        account_info = (
+            f"**Created:** <t:{int(member.created_at.timestamp())}:F>\n"
+            f"**Account Age:** {account_age_days} days ({account_age_days // 365} years)\n"
+            + (f"**Accent Color:** `{user.accent_color}`\n" if user.accent_color else "")
+            + f"**Avatar URL:** [Click here]({member.display_avatar.url})"
+            + (f"\n**Banner URL:** [Click here]({user.banner.url})" if user.banner else "")
+        )
+        embed.add_field(name="📅 Account Info", value=account_info, inline=True)
         
         # === AVATAR VARIATIONS ===
-        avatar_links = []
-        avatar_links.append(f"[Default]({member.display_avatar.replace(format='png', size=1024).url})")
-        avatar_links.append(f"[WebP]({member.display_avatar.replace(format='webp', size=1024).url})")
-        avatar_links.append(f"[JPG]({member.display_avatar.replace(format='jpg', size=1024).url})")
+        stem = _asset_stem(member.display_avatar)
+        avatar_links = f"[Default]({stem}.png?size=1024) • [WebP]({stem}.webp?size=1024) • [JPG]({stem}.jpg?size=1024)"
         if member.display_avatar.is_animated():
-            avatar_links.append(f"[GIF]({member.display_avatar.replace(format='gif', size=1024).url})")
-        embed.add_field(name="🖼️ Avatar Formats", value=' • '.join(avatar_links), inline=False)
+            avatar_links += f" • [GIF]({stem}.gif?size=1024)"
+        embed.add_field(name="🖼️ Avatar Formats", value=avatar_links, inline=False)
         
         embed.set_footer(
             text=f"Requested by {interaction.user} • All available data extracted",
@@ -374,6 +600,7 @@ class UtilityCog(commands.Cog):
             callback=self.context_menu_userinfo,
         )
         self.bot.tree.add_command(self.ctx_menu)
+        self._help_embed = self._build_help_embed()  # Static, so built once and shared
     
     async def cog_unload(self) -> None:
         self.bot.tree.remove_command(self.ctx_menu.name, type=self.ctx_menu.type)
@@ -390,13 +617,13 @@ class UtilityCog(commands.Cog):
         embed.set_thumbnail(url=member.display_avatar.url)
         await interaction.response.send_message(embed=embed, ephemeral=True)
     
-    @app_commands.command(name="help", description="Show bot commands and features")
-    async def help_command(self, interaction: discord.Interaction) -> None:
-        """Modern help command."""
+    @staticmethod
+    def _build_help_embed() -> discord.Embed:
+        """Build the static help embed."""
         embed = discord.Embed(
             title="🤖 Bot Commands",
             description="Here are all available commands:",
-            color=discord.Color.blurple()
+            color=_COLOR_BLURPLE
         )
         
         embed.add_field(
@@ -486,7 +713,12 @@ class UtilityCog(commands.Cog):
         )
         
         embed.set_footer(text="Tip: You can also use ! prefix for some commands")
-        await interaction.response.send_message(embed=embed)
+        return embed
+    
+    @app_commands.command(name="help", description="Show bot commands and features")
+    async def help_command(self, interaction: discord.Interaction) -> None:
+        """Modern help command."""
+        await interaction.response.send_message(embed=self._help_embed)
     
     @app_commands.command(name="ping", description="Check bot latency")
     async def ping(self, interaction: discord.Interaction) -> None:
@@ -496,7 +728,7 @@ class UtilityCog(commands.Cog):
         embed = discord.Embed(
             title="🏓 Pong!",
             description=f"Latency: **{latency}ms**",
-            color=discord.Color.green() if latency < 100 else discord.Color.orange()
+            color=_COLOR_GREEN if latency < 100 else _COLOR_ORANGE
         )
         await interaction.response.send_message(embed=embed)
     
@@ -508,7 +740,7 @@ class UtilityCog(commands.Cog):
         embed = discord.Embed(
             title=guild.name,
             description=guild.description or "No description",
-            color=discord.Color.blurple(),
+            color=_COLOR_BLURPLE,
             timestamp=discord.utils.utcnow()
         )
         
@@ -529,73 +761,159 @@ class UtilityCog(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
 
+class RoleButton(discord.ui.DynamicItem[discord.ui.Button], template=r'role_(?P<role_id>\d+)'):
+    """Persistent role toggle button, matched by its role_<id> custom_id."""
+    
+    def __init__(self, role_id: int, label: str = "Role") -> None:
+        super().__init__(
+            discord.ui.Button(
+                label=label,
+                style=discord.ButtonStyle.primary,
+                custom_id=f"role_{role_id}"
+            )
+        )
+        self.role_id = role_id
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match) -> 'RoleButton':
+        """Rebuild the button from a clicked role menu, including ones sent before a restart."""
+        return cls(int(match['role_id']), item.label or "Role")
+    
+    async def callback(self, interaction: discord.Interaction) -> None:
+        """Toggle the role on the clicking member."""
+        role = interaction.guild.get_role(self.role_id)
+        if role is None:
+            await interaction.response.send_message("❌ This role no longer exists!", ephemeral=True)
+            return
+        
+        member = interaction.user
+        if member.get_role(role.id):
+            await member.remove_roles(role)
+            await interaction.response.send_message(f"❌ Removed {role.mention}", ephemeral=True)
+        else:
+            await member.add_roles(role)
+            await interaction.response.send_message(f"✅ Added {role.mention}", ephemeral=True)
+
+# Guild features highlighted by /serveranalytics, in display order
+_FEATURE_MAP = (
+    ('COMMUNITY', "✅ Community"),
+    ('VERIFIED', "✅ Verified"),
+    ('PARTNERED', "✅ Partnered"),
+    ('DISCOVERABLE', "✅ Discoverable")
+)
+
+# Snipe caches keep the newest entry per channel, bounded and expiring
+SNIPE_CACHE_SIZE = 10_000
+SNIPE_TTL = timedelta(hours=1)
+
+class SnipeEntry(NamedTuple):
+    """A deleted message, stored as plain values so no Member is kept alive."""
+    content: str
+    author_id: int
+    author_name: str
+    author_avatar_url: str
+    time: datetime
+    attachments: Tuple[str, ...]
+
+class EditEntry(NamedTuple):
+    """An edited message, stored as plain values so no Member is kept alive."""
+    before: str
+    after: str
+    author_id: int
+    author_name: str
+    author_avatar_url: str
+    time: datetime
+
 class AdvancedCog(commands.Cog):
     """Advanced crazy commands."""
     
     def __init__(self, bot: ModernBot) -> None:
         self.bot = bot
-        self.snipe_cache = {}  # Store deleted messages
-        self.edit_cache = {}   # Store edited messages
+        self.snipe_cache: OrderedDict[int, SnipeEntry] = OrderedDict()  # Store deleted messages
+        self.edit_cache: OrderedDict[int, EditEntry] = OrderedDict()    # Store edited messages
+        self._assignable_roles: Dict[int, List[discord.Role]] = {}  # guild_id: role menu roles
+    
+    @staticmethod
+    def _cache_store(cache: OrderedDict, channel_id: int, entry: NamedTuple) -> None:
+        """Store an entry as most recent, evicting the oldest channels past the limit."""
+        cache[channel_id] = entry
+        cache.move_to_end(channel_id)
+        while len(cache) > SNIPE_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    @staticmethod
+    def _cache_get(cache: OrderedDict, channel_id: int) -> Optional[NamedTuple]:
+        """Get a channel's entry, dropping it if it has expired."""
+        data = cache.get(channel_id)
+        if data and discord.utils.utcnow() - data.time > SNIPE_TTL:
+            del cache[channel_id]
+            return None
+        return data
     
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message) -> None:
         """Cache deleted messages for snipe command."""
-        if message.author.bot:
+        # Nothing worth sniping: bots, or messages with neither text nor files (e.g. embeds only)
+        if message.author.bot or not (message.content or message.attachments):
             return
-        self.snipe_cache[message.channel.id] = {
-            'content': message.content,
-            'author': message.author,
-            'time': discord.utils.utcnow(),
-            'attachments': [att.url for att in message.attachments]
-        }
+        self._cache_store(self.snipe_cache, message.channel.id, SnipeEntry(
+            content=message.content,
+            author_id=message.author.id,
+            author_name=str(message.author),
+            author_avatar_url=message.author.display_avatar.url,
+            time=discord.utils.utcnow(),
+            attachments=tuple(att.url for att in message.attachments)
+        ))
     
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message) -> None:
         """Cache edited messages for editsnipe command."""
         if before.author.bot or before.content == after.content:
             return
-        self.edit_cache[before.channel.id] = {
-            'before': before.content,
-            'after': after.content,
-            'author': before.author,
-            'time': discord.utils.utcnow()
-        }
+        self._cache_store(self.edit_cache, before.channel.id, EditEntry(
+            before=before.content,
+            after=after.content,
+            author_id=before.author.id,
+            author_name=str(before.author),
+            author_avatar_url=before.author.display_avatar.url,
+            time=discord.utils.utcnow()
+        ))
     
     @app_commands.command(name="snipe", description="See the most recently deleted message in this channel")
     async def snipe(self, interaction: discord.Interaction) -> None:
         """Show the last deleted message."""
-        data = self.snipe_cache.get(interaction.channel_id)
+        data = self._cache_get(self.snipe_cache, interaction.channel_id)
         
         if not data:
             await interaction.response.send_message("❌ No recently deleted messages!", ephemeral=True)
             return
         
         embed = discord.Embed(
-            description=data['content'] or "*No text content*",
-            color=discord.Color.red(),
-            timestamp=data['time']
+            description=data.content or "*No text content*",
+            color=_COLOR_RED,
+            timestamp=data.time
         )
-        embed.set_author(name=f"{data['author']}", icon_url=data['author'].display_avatar.url)
+        embed.set_author(name=data.author_name, icon_url=data.author_avatar_url)
         embed.set_footer(text="Deleted")
         
-        if data['attachments']:
-            embed.add_field(name="📎 Attachments", value='\n'.join(data['attachments'][:3]), inline=False)
+        if data.attachments:
+            embed.add_field(name="📎 Attachments", value='\n'.join(data.attachments[:3]), inline=False)
         
         await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name="editsnipe", description="See the most recently edited message in this channel")
     async def editsnipe(self, interaction: discord.Interaction) -> None:
         """Show the last edited message."""
-        data = self.edit_cache.get(interaction.channel_id)
+        data = self._cache_get(self.edit_cache, interaction.channel_id)
         
         if not data:
             await interaction.response.send_message("❌ No recently edited messages!", ephemeral=True)
             return
         
-        embed = discord.Embed(color=discord.Color.orange(), timestamp=data['time'])
-        embed.set_author(name=f"{data['author']}", icon_url=data['author'].display_avatar.url)
-        embed.add_field(name="📝 Before", value=data['before'] or "*No text*", inline=False)
-        embed.add_field(name="✏️ After", value=data['after'] or "*No text*", inline=False)
+        embed = discord.Embed(color=_COLOR_ORANGE, timestamp=data.time)
+        embed.set_author(name=data.author_name, icon_url=data.author_avatar_url)
+        embed.add_field(name="📝 Before", value=data.before or "*No text*", inline=False)
+        embed.add_field(name="✏️ After", value=data.after or "*No text*", inline=False)
         embed.set_footer(text="Edited")
         
         await interaction.response.send_message(embed=embed)
@@ -629,7 +947,7 @@ class AdvancedCog(commands.Cog):
         
         embed = discord.Embed(
             title="📊 " + question,
-            color=discord.Color.blue(),
+            color=_COLOR_BLUE,
             timestamp=discord.utils.utcnow()
         )
         
@@ -643,48 +961,47 @@ class AdvancedCog(commands.Cog):
         await interaction.response.send_message(embed=embed)
         message = await interaction.original_response()
         
-        for i in range(len(options)):
-            await message.add_reaction(emojis[i])
+        await asyncio.gather(*(message.add_reaction(emoji) for emoji in emojis[:len(options)]))
+    
+    def _get_assignable_roles(self, guild: discord.Guild) -> List[discord.Role]:
+        """Get the roles offered by the role menu, cached until roles change."""
+        roles = self._assignable_roles.get(guild.id)
+        if roles is None:
+            roles = [r for r in guild.roles if not r.is_default() and not r.managed][:5]
+            self._assignable_roles[guild.id] = roles
+        return roles
+    
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role) -> None:
+        """Invalidate cached role menu roles."""
+        self._assignable_roles.pop(role.guild.id, None)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        """Invalidate cached role menu roles."""
+        self._assignable_roles.pop(after.guild.id, None)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        """Invalidate cached role menu roles."""
+        self._assignable_roles.pop(role.guild.id, None)
     
     @app_commands.command(name="rolemenu", description="Create a self-role menu with buttons")
     @app_commands.describe(title="Title of the role menu")
     async def rolemenu(self, interaction: discord.Interaction, title: str) -> None:
         """Create an interactive role selection menu."""
         
-        class RoleButton(discord.ui.Button):
-            def __init__(self, role: discord.Role):
-                super().__init__(
-                    label=role.name,
-                    style=discord.ButtonStyle.primary,
-                    custom_id=f"role_{role.id}"
-                )
-                self.role = role
-            
-            async def callback(self, interaction: discord.Interaction):
-                member = interaction.user
-                if self.role in member.roles:
-                    await member.remove_roles(self.role)
-                    await interaction.response.send_message(f"❌ Removed {self.role.mention}", ephemeral=True)
-                else:
-                    await member.add_roles(self.role)
-                    await interaction.response.send_message(f"✅ Added {self.role.mention}", ephemeral=True)
-        
-        class RoleView(discord.ui.View):
-            def __init__(self):
-                super().__init__(timeout=None)
-        
         embed = discord.Embed(
             title=f"🎭 {title}",
             description="Click buttons below to add/remove roles!",
-            color=discord.Color.blurple()
+            color=_COLOR_BLURPLE
         )
         
-        view = RoleView()
+        view = discord.ui.View(timeout=None)
         # Add some example roles (you'd want to make this configurable)
-        for role in interaction.guild.roles[:5]:
-            if role.name != "@everyone" and not role.managed:
-                view.add_item(RoleButton(role))
-                embed.add_field(name=role.name, value="Click to toggle", inline=True)
+        for role in self._get_assignable_roles(interaction.guild):
+            view.add_item(RoleButton(role.id, role.name))
+            embed.add_field(name=role.name, value="Click to toggle", inline=True)
         
         await interaction.response.send_message(embed=embed, view=view)
     
@@ -701,17 +1018,12 @@ class AdvancedCog(commands.Cog):
         embed.set_image(url=member.display_avatar.url)
         
         # Add all format links
-        formats = []
-        for size in [128, 256, 512, 1024, 2048]:
-            links = []
-            links.append(f"[PNG]({member.display_avatar.replace(format='png', size=size).url})")
-            links.append(f"[WebP]({member.display_avatar.replace(format='webp', size=size).url})")
-            links.append(f"[JPG]({member.display_avatar.replace(format='jpg', size=size).url})")
-            if member.display_avatar.is_animated():
-                links.append(f"[GIF]({member.display_avatar.replace(format='gif', size=size).url})")
-            formats.append(f"**{size}px:** {' • '.join(links)}")
-        
-        embed.description = '\n'.join(formats)
+        stem = _asset_stem(member.display_avatar)
+        link_formats = _ANIMATED_LINK_FORMATS if member.display_avatar.is_animated() else _STATIC_LINK_FORMATS
+        embed.description = '\n'.join([
+            f"**{size}px:** " + ' • '.join([f"[{label}]({stem}.{fmt}?size={size})" for label, fmt in link_formats])
+            for size in (128, 256, 512, 1024, 2048)
+        ])
         
         await interaction.response.send_message(embed=embed)
     
@@ -720,8 +1032,8 @@ class AdvancedCog(commands.Cog):
     async def banner(self, interaction: discord.Interaction, member: Optional[discord.Member] = None) -> None:
         """Get user or server banner."""
         if member:
-            # User banner
-            user = await self.bot.fetch_user(member.id)
+            # User banner (profile fetches are cached, including users without one)
+            user = await self.bot.fetch_full_user(member.id)
             if user.banner:
                 embed = discord.Embed(
                     title=f"🎨 {member.display_name}'s Banner",
@@ -738,7 +1050,7 @@ class AdvancedCog(commands.Cog):
             if guild.banner:
                 embed = discord.Embed(
                     title=f"🎨 {guild.name}'s Banner",
-                    color=discord.Color.blurple()
+                    color=_COLOR_BLURPLE
                 )
                 embed.set_image(url=guild.banner.url)
                 embed.description = f"[Download Banner]({guild.banner.url})"
@@ -752,12 +1064,14 @@ class AdvancedCog(commands.Cog):
         await interaction.response.defer()
 
         guild = interaction.guild
+        now = discord.utils.utcnow()
 
         # Calculate statistics - single pass through members
         total_members = guild.member_count
         humans = 0
         bots = 0
         online = 0
+        role_counts: Counter[int] = Counter()
         
         for member in guild.members:
             if not member.bot:
@@ -765,12 +1079,17 @@ class AdvancedCog(commands.Cog):
             else:
                 bots += 1
             
-            if member.status != discord.Status.offline:
+            if member.status is not discord.Status.offline:
                 online += 1
+            
+            role_counts.update(r.id for r in member.roles)
 
         # Role statistics
-        roles_with_members = [(role, len(role.members)) for role in guild.roles if len(role.members) > 0]
-        roles_with_members.sort(key=lambda x: x[1], reverse=True)
+        roles_with_members = sorted(
+            ((role, role_counts[role.id]) for role in guild.roles if role_counts[role.id] and not role.is_default()),
+            key=lambda x: x[1],
+            reverse=True
+        )
 
         # Channel statistics
         text_channels = len(guild.text_channels)
@@ -778,79 +1097,72 @@ class AdvancedCog(commands.Cog):
         categories = len(guild.categories)
 
         # Emoji statistics
-        static_emojis = 0
-        animated_emojis = 0
-        for emoji in guild.emojis:
-            if emoji.animated:
-                animated_emojis += 1
-            else:
-                static_emojis += 1
+        animated_emojis = sum(1 for emoji in guild.emojis if emoji.animated)
+        static_emojis = len(guild.emojis) - animated_emojis
         
         embed = discord.Embed(
             title=f"📊 {guild.name} Analytics",
-            color=discord.Color.blue(),
-            timestamp=discord.utils.utcnow()
+            color=_COLOR_BLUE,
+            timestamp=now
         )
         
         if guild.icon:
             embed.set_thumbnail(url=guild.icon.url)
         
         # Member breakdown
-        member_info = []
-        member_info.append(f"**Total Members:** {total_members}")
-        member_info.append(f"**👤 Humans:** {humans} ({humans/total_members*100:.1f}%)")
-        member_info.append(f"**🤖 Bots:** {bots} ({bots/total_members*100:.1f}%)")
-        member_info.append(f"**🟢 Online:** {online} ({online/total_members*100:.1f}%)")
-        embed.add_field(name="👥 Members", value='\n'.join(member_info), inline=True)
+        embed.add_field(
+            name="👥 Members",
+            value=f"**Total Members:** {total_members}\n"
+                  f"**👤 Humans:** {humans} ({humans/total_members*100:.1f}%)\n"
+                  f"**🤖 Bots:** {bots} ({bots/total_members*100:.1f}%)\n"
+                  f"**🟢 Online:** {online} ({online/total_members*100:.1f}%)",
+            inline=True
+        )
         
         # Channel breakdown
-        channel_info = []
-        channel_info.append(f"**💬 Text:** {text_channels}")
-        channel_info.append(f"**🎙️ Voice:** {voice_channels}")
-        channel_info.append(f"**📁 Categories:** {categories}")
-        channel_info.append(f"**Total:** {len(guild.channels)}")
-        embed.add_field(name="📺 Channels", value='\n'.join(channel_info), inline=True)
+        embed.add_field(
+            name="📺 Channels",
+            value=f"**💬 Text:** {text_channels}\n"
+                  f"**🎙️ Voice:** {voice_channels}\n"
+                  f"**📁 Categories:** {categories}\n"
+                  f"**Total:** {len(guild.channels)}",
+            inline=True
+        )
         
         # Server features
-        features = []
-        if 'COMMUNITY' in guild.features:
-            features.append("✅ Community")
-        if 'VERIFIED' in guild.features:
-            features.append("✅ Verified")
-        if 'PARTNERED' in guild.features:
-            features.append("✅ Partnered")
-        if 'DISCOVERABLE' in guild.features:
-            features.append("✅ Discoverable")
-        if 'VANITY_URL' in guild.features:
+        guild_features = set(guild.features)
+        features = [label for flag, label in _FEATURE_MAP if flag in guild_features]
+        if 'VANITY_URL' in guild_features:
             features.append(f"✅ Vanity URL: {guild.vanity_url_code}")
         
         if features:
             embed.add_field(name="⭐ Features", value='\n'.join(features[:5]), inline=True)
         
         # Top roles
-        top_roles = []
-        for role, count in roles_with_members[:5]:
-            if role.name != "@everyone":
-                top_roles.append(f"{role.mention}: {count} members")
+        top_roles = [f"{role.mention}: {count} members" for role, count in roles_with_members[:5]]
         if top_roles:
             embed.add_field(name="🏆 Top Roles", value='\n'.join(top_roles), inline=False)
         
         # Boost info
-        boost_info = []
-        boost_info.append(f"**Level:** {guild.premium_tier}/3")
-        boost_info.append(f"**Boosts:** {guild.premium_subscription_count}")
-        boost_info.append(f"**Boosters:** {len(guild.premium_subscribers)}")
-        embed.add_field(name="💎 Boost Status", value='\n'.join(boost_info), inline=True)
+        embed.add_field(
+            name="💎 Boost Status",
+            value=f"**Level:** {guild.premium_tier}/3\n"
+                  f"**Boosts:** {guild.premium_subscription_count}\n"
+                  f"**Boosters:** {len(guild.premium_subscribers)}",
+            inline=True
+        )
         
         # Emoji info
-        emoji_info = []
-        emoji_info.append(f"**Static:** {static_emojis}/{guild.emoji_limit}")
-        emoji_info.append(f"**Animated:** {animated_emojis}/{guild.emoji_limit}")
-        emoji_info.append(f"**Total:** {len(guild.emojis)}/{guild.emoji_limit*2}")
-        embed.add_field(name="😀 Emojis", value='\n'.join(emoji_info), inline=True)
+        embed.add_field(
+            name="😀 Emojis",
+            value=f"**Static:** {static_emojis}/{guild.emoji_limit}\n"
+                  f"**Animated:** {animated_emojis}/{guild.emoji_limit}\n"
+                  f"**Total:** {len(guild.emojis)}/{guild.emoji_limit*2}",
+            inline=True
+        )
         
         # Server age
-        age_days = (discord.utils.utcnow() - guild.created_at).days
+        age_days = (now - guild.created_at).days
         embed.add_field(
             name="🎂 Server Age",
             value=f"{age_days} days ({age_days // 365} years)\nCreated: <t:{int(guild.created_at.timestamp())}:R>",
@@ -867,7 +1179,7 @@ class AdvancedCog(commands.Cog):
         """Set AFK status (would need database for persistence)."""
         embed = discord.Embed(
             description=f"💤 {interaction.user.mention} is now AFK: {reason}",
-            color=discord.Color.yellow()
+            color=_COLOR_YELLOW
         )
         await interaction.response.send_message(embed=embed)
     
@@ -882,30 +1194,50 @@ class AdvancedCog(commands.Cog):
 
         embed = discord.Embed(
             title=f"👥 {guild.name} Member Count",
-            color=discord.Color.blue()
+            color=_COLOR_BLUE
         )
 
         # Create a simple text-based bar
-        human_bar = "█" * int((humans/total) * 20)
-        bot_bar = "█" * int((bots/total) * 20)
-
         embed.add_field(
             name=f"👤 Humans: {humans}",
-            value=f"`{human_bar}` {humans/total*100:.1f}%",
+            value=f"`{_bar(humans, total)}` {_pct(humans, total):.1f}%",
             inline=False
         )
         embed.add_field(
             name=f"🤖 Bots: {bots}",
-            value=f"`{bot_bar}` {bots/total*100:.1f}%",
+            value=f"`{_bar(bots, total)}` {_pct(bots, total):.1f}%",
             inline=False
         )
         embed.add_field(name="📊 Total", value=str(total), inline=False)
 
         await interaction.response.send_message(embed=embed)
 
+# Icons for audit log actions shown by /auditlog
+_AUDIT_ICONS = {
+    discord.AuditLogAction.kick: "👢",
+    discord.AuditLogAction.ban: "🔨",
+    discord.AuditLogAction.unban: "✅",
+    discord.AuditLogAction.member_update: "👤",
+    discord.AuditLogAction.member_role_update: "🎭",
+    discord.AuditLogAction.channel_create: "➕",
+    discord.AuditLogAction.channel_delete: "❌",
+    discord.AuditLogAction.message_delete: "🗑️",
+}
+
 class TrackingCog(commands.Cog):
     """Advanced tracking and monitoring commands."""
     
+    EVENT_DESCRIPTIONS = {
+        'all': '🌐 Everything (all events below)',
+        'members': '👤 Joins, leaves, username changes, nickname changes',
+        'messages': '💬 Deleted messages, edited messages, bulk deletes',
+        'voice': '🎙️ Join/leave voice, mute/unmute, stream start/stop',
+        'roles': '🎭 Role created, deleted, updated, member role changes',
+        'channels': '📺 Channel created, deleted, updated, permission changes',
+        'moderation': '🔨 Bans, unbans, kicks, timeouts, warnings',
+        'server': '⚙️ Server updates, emoji changes, sticker changes'
+    }
+    
     def __init__(self, bot: ModernBot) -> None:
         self.bot = bot
     
@@ -942,6 +1274,7 @@ class TrackingCog(commands.Cog):
         )
         
         created_channels = []
+        failed: List[str] = []
         
         if setup_type == 'single':
             # Create single channel for all logs
@@ -972,29 +1305,44 @@ class TrackingCog(commands.Cog):
             if guild.id not in self.bot.log_channels:
                 self.bot.log_channels[guild.id] = {}
             
+            # One at a time so the channels keep this order in the category; each
+            # success is recorded right away so a later failure doesn't orphan it
             for event_type, channel_name, topic in log_types:
-                channel = await guild.create_text_channel(
-                    name=channel_name,
-                    category=category,
-                    topic=topic
-                )
+                try:
+                    channel = await guild.create_text_channel(
+                        name=channel_name,
+                        category=category,
+                        topic=topic
+                    )
+                except discord.HTTPException as e:
+                    logger.error(f"Failed to create {event_type} log channel: {e}")
+                    failed.append(event_type)
+                    continue
                 
                 self.bot.log_channels[guild.id][event_type] = channel.id
                 created_channels.append((event_type, channel))
         
         # Save configuration
+        self.bot.invalidate_log_channels(guild.id)
         self.bot.save_config()
         
         # Create summary embed
         embed = discord.Embed(
             title="✅ Logging Channels Created!",
             description=f"Successfully set up logging in **{category.name}**",
-            color=discord.Color.green(),
+            color=_COLOR_GREEN,
             timestamp=discord.utils.utcnow()
         )
         
         channels_list = '\n'.join([f"**{event_type}** → {channel.mention}" for event_type, channel in created_channels])
-        embed.add_field(name="📋 Configured Channels", value=channels_list, inline=False)
+        embed.add_field(name="📋 Configured Channels", value=channels_list or "None", inline=False)
+        
+        if failed:
+            embed.add_field(
+                name="⚠️ Failed",
+                value=f"Could not create: {', '.join(failed)}. Use `/setlog` to set these up.",
+                inline=False
+            )
         
         embed.add_field(
             name="🔐 Permissions",
@@ -1031,12 +1379,13 @@ class TrackingCog(commands.Cog):
             self.bot.log_channels[guild_id] = {}
         
         self.bot.log_channels[guild_id][event_type] = channel.id
+        self.bot.invalidate_log_channels(guild_id)
         self.bot.save_config()
         
         embed = discord.Embed(
             title="✅ Logging Configured",
             description=f"**Event Type:** {event_type}\n**Channel:** {channel.mention}",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         
         embed.add_field(
@@ -1049,24 +1398,13 @@ class TrackingCog(commands.Cog):
     
     def _get_event_description(self, event_type: str) -> str:
         """Get description of what events will be logged."""
-        descriptions = {
-            'all': '🌐 Everything (all events below)',
-            'members': '👤 Joins, leaves, username changes, nickname changes',
-            'messages': '💬 Deleted messages, edited messages, bulk deletes',
-            'voice': '🎙️ Join/leave voice, mute/unmute, stream start/stop',
-            'roles': '🎭 Role created, deleted, updated, member role changes',
-            'channels': '📺 Channel created, deleted, updated, permission changes',
-            'moderation': '🔨 Bans, unbans, kicks, timeouts, warnings',
-            'server': '⚙️ Server updates, emoji changes, sticker changes'
-        }
-        return descriptions.get(event_type, 'Unknown')
+        return self.EVENT_DESCRIPTIONS.get(event_type, 'Unknown')
     
     @app_commands.command(name="tracking", description="View detailed tracking data for a user")
     @app_commands.describe(member="The member to track")
     async def tracking(self, interaction: discord.Interaction, member: Optional[discord.Member] = None) -> None:
         """View user tracking data."""
         member = member or interaction.user
-        data = self.bot.user_activity[member.id]
         
         embed = discord.Embed(
             title=f"📊 Tracking Data: {member.display_name}",
@@ -1075,10 +1413,10 @@ class TrackingCog(commands.Cog):
         )
         embed.set_thumbnail(url=member.display_avatar.url)
         
-        embed.add_field(name="💬 Messages Sent", value=f"{data['messages']:,}", inline=True)
-        embed.add_field(name="🎙️ Voice Time", value=f"{data['voice_time']} minutes", inline=True)
-        embed.add_field(name="🔄 Server Joins", value=str(data['joins']), inline=True)
-        embed.add_field(name="👋 Server Leaves", value=str(data['leaves']), inline=True)
+        embed.add_field(name="💬 Messages Sent", value=f"{self.bot.msg_counts[member.id]:,}", inline=True)
+        embed.add_field(name="🎙️ Voice Time", value=f"{self.bot.voice_time[member.id]} minutes", inline=True)
+        embed.add_field(name="🔄 Server Joins", value=str(self.bot.join_counts[member.id]), inline=True)
+        embed.add_field(name="👋 Server Leaves", value=str(self.bot.leave_counts[member.id]), inline=True)
         
         embed.set_footer(text="Live tracking data")
         await interaction.response.send_message(embed=embed)
@@ -1089,24 +1427,26 @@ class TrackingCog(commands.Cog):
         """Deep member tracking with ALL information."""
         await interaction.response.defer()
         member = member or interaction.user
+        now = discord.utils.utcnow()
         
         embed = discord.Embed(
             title=f"🔍 Complete Profile Analysis",
             description=f"Comprehensive tracking data for {member.mention}",
-            color=discord.Color.gold(),
-            timestamp=discord.utils.utcnow()
+            color=_COLOR_GOLD,
+            timestamp=now
         )
         embed.set_thumbnail(url=member.display_avatar.url)
         
         # Account basics
-        account_age = (discord.utils.utcnow() - member.created_at).days
-        server_age = (discord.utils.utcnow() - member.joined_at).days
+        account_age = (now - member.created_at).days
+        server_age = (now - member.joined_at).days
         
+        join_position = self.bot.get_join_position(member)
         embed.add_field(
             name="⏰ Time Stats",
             value=f"**Account Age:** {account_age} days\n"
                   f"**Server Age:** {server_age} days\n"
-                  f"**Join Position:** #{sorted(interaction.guild.members, key=lambda m: m.joined_at).index(member) + 1}",
+                  f"**Join Position:** {f'#{join_position}' if join_position else 'Unknown'}",
             inline=True
         )
         
@@ -1120,7 +1460,7 @@ class TrackingCog(commands.Cog):
         )
         
         # Role count and permissions
-        role_count = len([r for r in member.roles if r.name != '@everyone'])
+        role_count = len(member.roles) - 1  # Minus @everyone
         admin = member.guild_permissions.administrator
         
         embed.add_field(
@@ -1132,12 +1472,11 @@ class TrackingCog(commands.Cog):
         )
         
         # Activity data
-        data = self.bot.user_activity[member.id]
         embed.add_field(
             name="📈 Activity Metrics",
-            value=f"**Messages:** {data['messages']:,}\n"
-                  f"**Voice Time:** {data['voice_time']} min\n"
-                  f"**Joins/Leaves:** {data['joins']}/{data['leaves']}",
+            value=f"**Messages:** {self.bot.msg_counts[member.id]:,}\n"
+                  f"**Voice Time:** {self.bot.voice_time[member.id]} min\n"
+                  f"**Joins/Leaves:** {self.bot.join_counts[member.id]}/{self.bot.leave_counts[member.id]}",
             inline=True
         )
         
@@ -1149,13 +1488,12 @@ class TrackingCog(commands.Cog):
         embed.add_field(name="💎 Boost Status", value=boost_info, inline=True)
         
         # Moderation status
-        mod_info = []
         if member.timed_out_until:
-            mod_info.append(f"⏰ Timed out until: <t:{int(member.timed_out_until.timestamp())}:R>")
+            mod_info = f"⏰ Timed out until: <t:{int(member.timed_out_until.timestamp())}:R>"
         else:
-            mod_info.append("✅ No active timeout")
+            mod_info = "✅ No active timeout"
         
-        embed.add_field(name="🔨 Moderation", value='\n'.join(mod_info), inline=True)
+        embed.add_field(name="🔨 Moderation", value=mod_info, inline=True)
         
         embed.set_footer(text="Real-time comprehensive tracking")
         await interaction.followup.send(embed=embed)
@@ -1167,26 +1505,23 @@ class TrackingCog(commands.Cog):
 
         guild = interaction.guild
 
-        # Single pass through members for all stats
+        # Voice counts come from each voice and stage channel's voice states (only members in voice)
         now = discord.utils.utcnow()
-        online = 0
-        in_voice = 0
-        streaming = 0
-        
-        for member in guild.members:
-            if member.status != discord.Status.offline:
-                online += 1
-            if member.voice:
-                in_voice += 1
-                if member.voice.self_stream:
-                    streaming += 1
+        voice_states = [
+            state
+            for channel in chain(guild.voice_channels, guild.stage_channels)
+            for state in channel.voice_states.values()
+        ]
+        in_voice = len(voice_states)
+        streaming = sum(1 for state in voice_states if state.self_stream)
+        online = sum(1 for member in guild.members if member.status is not discord.Status.offline)
         
         boosters = len(guild.premium_subscribers)
         
         embed = discord.Embed(
             title=f"📊 Live Server Statistics",
             description=f"Real-time data for **{guild.name}**",
-            color=discord.Color.blue(),
+            color=_COLOR_BLUE,
             timestamp=now
         )
         
@@ -1226,8 +1561,8 @@ class TrackingCog(commands.Cog):
         )
         
         # Calculate activity scores
-        total_msgs = sum(data['messages'] for data in self.bot.user_activity.values())
-        total_voice = sum(data['voice_time'] for data in self.bot.user_activity.values())
+        total_msgs = self.bot.msg_counts.total()
+        total_voice = self.bot.voice_time.total()
         
         embed.add_field(
             name="📈 Tracked Activity",
@@ -1244,57 +1579,35 @@ class TrackingCog(commands.Cog):
         """Show activity heatmap and patterns."""
         guild = interaction.guild
         
-        # Get member status breakdown
-        online = len([m for m in guild.members if m.status == discord.Status.online])
-        idle = len([m for m in guild.members if m.status == discord.Status.idle])
-        dnd = len([m for m in guild.members if m.status == discord.Status.dnd])
-        offline = len([m for m in guild.members if m.status == discord.Status.offline])
+        # Get member status breakdown in one pass
+        status_counts = Counter(m.status for m in guild.members)
         
         embed = discord.Embed(
             title="📊 Server Activity Overview",
-            color=discord.Color.blue(),
+            color=_COLOR_BLUE,
             timestamp=discord.utils.utcnow()
         )
         
         # Status breakdown with bars
         total = guild.member_count
-        embed.add_field(
-            name="🟢 Online",
-            value=f"`{'█' * int((online/total) * 20)}` {online} ({online/total*100:.1f}%)",
-            inline=False
-        )
-        embed.add_field(
-            name="🟡 Idle",
-            value=f"`{'█' * int((idle/total) * 20)}` {idle} ({idle/total*100:.1f}%)",
-            inline=False
-        )
-        embed.add_field(
-            name="🔴 DND",
-            value=f"`{'█' * int((dnd/total) * 20)}` {dnd} ({dnd/total*100:.1f}%)",
-            inline=False
-        )
-        embed.add_field(
-            name="⚫ Offline",
-            value=f"`{'█' * int((offline/total) * 20)}` {offline} ({offline/total*100:.1f}%)",
-            inline=False
-        )
+        for status, label in _ACTIVITY_STATUS_FIELDS:
+            count = status_counts[status]
+            embed.add_field(
+                name=label,
+                value=f"`{_bar(count, total)}` {count} ({_pct(count, total):.1f}%)",
+                inline=False
+            )
         
-        # Most active users
-        top_users = sorted(
-            [(user_id, data['messages']) for user_id, data in self.bot.user_activity.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
+        # Most active users still in this guild
+        top_users = heapq.nlargest(
+            5,
+            ((user, msgs) for user_id, msgs in self.bot.msg_counts.items() if (user := guild.get_member(user_id))),
+            key=lambda x: x[1]
+        )
         
         if top_users:
-            top_text = []
-            for user_id, msgs in top_users:
-                user = guild.get_member(user_id)
-                if user:
-                    top_text.append(f"{user.mention}: {msgs:,} messages")
-            
-            if top_text:
-                embed.add_field(name="🏆 Most Active", value='\n'.join(top_text), inline=False)
+            top_text = [f"{user.mention}: {msgs:,} messages" for user, msgs in top_users]
+            embed.add_field(name="🏆 Most Active", value='\n'.join(top_text), inline=False)
         
         await interaction.response.send_message(embed=embed)
     
@@ -1306,31 +1619,24 @@ class TrackingCog(commands.Cog):
         await interaction.response.defer()
         
         limit = min(limit, 25)
+        # Users ship with the audit log page, so one fetch covers every entry
+        raw_entries = [entry async for entry in interaction.guild.audit_logs(limit=limit)]
         entries = []
         
-        async for entry in interaction.guild.audit_logs(limit=limit):
-            action_icons = {
-                discord.AuditLogAction.kick: "👢",
-                discord.AuditLogAction.ban: "🔨",
-                discord.AuditLogAction.unban: "✅",
-                discord.AuditLogAction.member_update: "👤",
-                discord.AuditLogAction.member_role_update: "🎭",
-                discord.AuditLogAction.channel_create: "➕",
-                discord.AuditLogAction.channel_delete: "❌",
-                discord.AuditLogAction.message_delete: "🗑️",
-            }
-            
-            icon = action_icons.get(entry.action, "📝")
+        for entry in raw_entries:
+            icon = _AUDIT_ICONS.get(entry.action, "📝")
             timestamp = f"<t:{int(entry.created_at.timestamp())}:R>"
-            target = entry.target.name if hasattr(entry.target, 'name') else str(entry.target)
+            target = getattr(entry.target, 'name', None) or str(entry.target)
+            # Mention by id when the user is missing from the payload; no extra fetch needed
+            user = entry.user.mention if entry.user else f"<@{entry.user_id}>"
             
-            entries.append(f"{icon} **{entry.action.name}** by {entry.user.mention}\n"
+            entries.append(f"{icon} **{entry.action.name}** by {user}\n"
                          f"Target: {target} • {timestamp}")
         
         embed = discord.Embed(
             title="📜 Recent Audit Log",
             description='\n\n'.join(entries) if entries else "No recent entries",
-            color=discord.Color.blue(),
+            color=_COLOR_BLUE,
             timestamp=discord.utils.utcnow()
         )
         
@@ -1341,33 +1647,95 @@ class AutoLoggerCog(commands.Cog):
     
     def __init__(self, bot: ModernBot) -> None:
         self.bot = bot
+        self._log_queues: Dict[int, asyncio.Queue] = {}  # channel_id: pending embeds
+        self._log_workers: Dict[int, asyncio.Task] = {}  # channel_id: delivery task
+        self._pending_msgs: Counter[int] = Counter()  # user_id: messages since last flush
+        self._ban_entries: Dict[Tuple[int, int], Tuple[float, discord.AuditLogEntry]] = {}  # (guild_id, target_id): (seen, entry)
+    
+    async def cog_load(self) -> None:
+        self.flush_msg_counts.start()
+    
+    async def cog_unload(self) -> None:
+        self.flush_msg_counts.cancel()
+        self.bot.msg_counts.update(self._pending_msgs)
+        self._pending_msgs.clear()
+        for task in list(self._log_workers.values()):
+            task.cancel()
+    
+    @tasks.loop(seconds=5)
+    async def flush_msg_counts(self) -> None:
+        """Fold buffered message counts into the shared activity counter."""
+        if self._pending_msgs:
+            pending, self._pending_msgs = self._pending_msgs, Counter()
+            self.bot.msg_counts.update(pending)
     
     async def send_log(self, guild_id: int, event_type: str, embed: discord.Embed) -> None:
-        """Send log to configured channel."""
-        if guild_id not in self.bot.log_channels:
+        """Queue a log embed for batched delivery to the configured channel."""
+        channel = self.bot.get_log_channel(guild_id, event_type)
+        if channel is None:
             return
         
-        log_config = self.bot.log_channels[guild_id]
-        channel_id = log_config.get(event_type) or log_config.get('all')
-        
-        if channel_id:
-            try:
-                channel = self.bot.get_channel(channel_id)
-                if channel:
-                    await channel.send(embed=embed)
-            except Exception as e:
-                logger.error(f"Failed to send log: {e}")
+        queue = self._log_queues.get(channel.id)
+        if queue is None:
+            queue = self._log_queues[channel.id] = asyncio.Queue()
+            self._log_workers[channel.id] = asyncio.create_task(self._log_worker(guild_id, channel, queue))
+        queue.put_nowait(embed)
+    
+    async def _log_worker(self, guild_id: int, channel: discord.abc.Messageable, queue: asyncio.Queue) -> None:
+        """Drain a channel's log queue, posting up to 10 embeds per message."""
+        loop = asyncio.get_running_loop()
+        carry = None
+        try:
+            while True:
+                embed = carry or await queue.get()
+                carry = None
+                embeds, size = [embed], len(embed)
+                deadline = loop.time() + LOG_BATCH_LINGER
+                
+                # Take whatever is already queued, then linger briefly for stragglers
+                while len(embeds) < LOG_BATCH_SIZE:
+                    try:
+                        embed = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            embed = await asyncio.wait_for(queue.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    
+                    if size + len(embed) > EMBED_TOTAL_LIMIT:
+                        carry = embed  # Starts the next batch
+                        break
+                    embeds.append(embed)
+                    size += len(embed)
+                
+                try:
+                    await channel.send(embeds=embeds)
+                except discord.NotFound:
+                    # Log channel was deleted; resolve again next time
+                    self.bot.invalidate_log_channels(guild_id)
+                    return
+                except discord.HTTPException as e:
+                    logger.error(f"Failed to send log: {e}")
+        finally:
+            self._log_queues.pop(channel.id, None)
+            self._log_workers.pop(channel.id, None)
     
     # === MEMBER EVENTS ===
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member) -> None:
         """Track member joins."""
-        self.bot.user_activity[member.id]['joins'] += 1
+        self.bot.join_counts[member.id] += 1
+        
+        if self.bot.get_log_channel(member.guild.id, 'members') is None:
+            return
         
         embed = discord.Embed(
             title="👋 Member Joined",
             description=f"{member.mention} joined the server",
-            color=discord.Color.green(),
+            color=_COLOR_GREEN,
             timestamp=discord.utils.utcnow()
         )
         embed.set_thumbnail(url=member.display_avatar.url)
@@ -1380,23 +1748,28 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member) -> None:
         """Track member leaves."""
-        self.bot.user_activity[member.id]['leaves'] += 1
+        self.bot.leave_counts[member.id] += 1
+        now = discord.utils.utcnow()
+        
+        if self.bot.get_log_channel(member.guild.id, 'members') is None:
+            return
         
         embed = discord.Embed(
             title="👋 Member Left",
             description=f"{member.mention} left the server",
-            color=discord.Color.red(),
-            timestamp=discord.utils.utcnow()
+            color=_COLOR_RED,
+            timestamp=now
         )
         embed.set_thumbnail(url=member.display_avatar.url)
         
         if member.joined_at:
-            days_in_server = (discord.utils.utcnow() - member.joined_at).days
+            days_in_server = (now - member.joined_at).days
             embed.add_field(name="Time in Server", value=f"{days_in_server} days", inline=True)
         
-        roles = [r.mention for r in member.roles if r.name != '@everyone']
+        # member.roles always starts with @everyone; only the first five others are shown
+        roles = member.roles[1:6]
         if roles:
-            embed.add_field(name="Roles", value=' '.join(roles[:5]), inline=False)
+            embed.add_field(name="Roles", value=' '.join([r.mention for r in roles]), inline=False)
         
         embed.set_footer(text=f"User ID: {member.id}")
         
@@ -1405,14 +1778,16 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
         """Track member updates (nickname, roles, etc)."""
+        if self.bot.get_log_channel(after.guild.id, 'members') is None:
+            return
+        
         embed = None
         
         # Nickname change
         if before.nick != after.nick:
             embed = discord.Embed(
                 title="✏️ Nickname Changed",
-                color=discord.Color.blue(),
-                timestamp=discord.utils.utcnow()
+                color=_COLOR_BLUE
             )
             embed.add_field(name="Member", value=after.mention, inline=False)
             embed.add_field(name="Before", value=before.nick or "*None*", inline=True)
@@ -1420,15 +1795,15 @@ class AutoLoggerCog(commands.Cog):
             embed.set_thumbnail(url=after.display_avatar.url)
         
         # Role changes
-        elif before.roles != after.roles:
-            added = [r for r in after.roles if r not in before.roles]
-            removed = [r for r in before.roles if r not in after.roles]
+        elif (before_ids := {r.id for r in before.roles}) != (after_ids := {r.id for r in after.roles}):
+            # Diff on role id sets; keep role order for display
+            added = [r for r in after.roles if r.id not in before_ids]
+            removed = [r for r in before.roles if r.id not in after_ids]
             
             embed = discord.Embed(
                 title="🎭 Roles Updated",
                 description=f"Role changes for {after.mention}",
-                color=discord.Color.blue(),
-                timestamp=discord.utils.utcnow()
+                color=_COLOR_BLUE
             )
             
             if added:
@@ -1444,19 +1819,18 @@ class AutoLoggerCog(commands.Cog):
                 embed = discord.Embed(
                     title="⏰ Member Timed Out",
                     description=f"{after.mention} was timed out",
-                    color=discord.Color.orange(),
-                    timestamp=discord.utils.utcnow()
+                    color=_COLOR_ORANGE
                 )
                 embed.add_field(name="Until", value=f"<t:{int(after.timed_out_until.timestamp())}:F>")
             else:
                 embed = discord.Embed(
                     title="✅ Timeout Removed",
                     description=f"{after.mention} timeout was removed",
-                    color=discord.Color.green(),
-                    timestamp=discord.utils.utcnow()
+                    color=_COLOR_GREEN
                 )
         
         if embed:
+            embed.timestamp = discord.utils.utcnow()
             embed.set_footer(text=f"User ID: {after.id}")
             await self.send_log(after.guild.id, 'members', embed)
     
@@ -1465,18 +1839,21 @@ class AutoLoggerCog(commands.Cog):
     async def on_message(self, message: discord.Message) -> None:
         """Track messages."""
         if not message.author.bot and message.guild:
-            self.bot.user_activity[message.author.id]['messages'] += 1
+            self._pending_msgs[message.author.id] += 1
     
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message) -> None:
         """Log deleted messages."""
-        if message.author.bot:
+        if message.guild is None or message.author.bot:
+            return
+        
+        if self.bot.get_log_channel(message.guild.id, 'messages') is None:
             return
         
         embed = discord.Embed(
             title="🗑️ Message Deleted",
             description=message.content[:1024] if message.content else "*No text content*",
-            color=discord.Color.red(),
+            color=_COLOR_RED,
             timestamp=discord.utils.utcnow()
         )
         embed.set_author(name=str(message.author), icon_url=message.author.display_avatar.url)
@@ -1494,12 +1871,18 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message) -> None:
         """Log edited messages."""
-        if before.author.bot or before.content == after.content:
+        # Embed unfurls fire edits too, but never set edited_at
+        if after.edited_at is None:
+            return
+        if before.guild is None or before.author.bot or before.content == after.content:
+            return
+        
+        if self.bot.get_log_channel(before.guild.id, 'messages') is None:
             return
         
         embed = discord.Embed(
             title="✏️ Message Edited",
-            color=discord.Color.orange(),
+            color=_COLOR_ORANGE,
             timestamp=discord.utils.utcnow()
         )
         embed.set_author(name=str(before.author), icon_url=before.author.display_avatar.url)
@@ -1515,6 +1898,9 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState) -> None:
         """Track voice activity."""
+        if self.bot.get_log_channel(member.guild.id, 'voice') is None:
+            return
+        
         embed = None
         
         # Joined voice
@@ -1522,8 +1908,7 @@ class AutoLoggerCog(commands.Cog):
             embed = discord.Embed(
                 title="🎙️ Joined Voice Channel",
                 description=f"{member.mention} joined {after.channel.mention}",
-                color=discord.Color.green(),
-                timestamp=discord.utils.utcnow()
+                color=_COLOR_GREEN
             )
         
         # Left voice
@@ -1531,8 +1916,7 @@ class AutoLoggerCog(commands.Cog):
             embed = discord.Embed(
                 title="👋 Left Voice Channel",
                 description=f"{member.mention} left {before.channel.mention}",
-                color=discord.Color.red(),
-                timestamp=discord.utils.utcnow()
+                color=_COLOR_RED
             )
         
         # Moved channels
@@ -1540,8 +1924,7 @@ class AutoLoggerCog(commands.Cog):
             embed = discord.Embed(
                 title="🔄 Moved Voice Channels",
                 description=f"{member.mention} moved channels",
-                color=discord.Color.blue(),
-                timestamp=discord.utils.utcnow()
+                color=_COLOR_BLUE
             )
             embed.add_field(name="From", value=before.channel.mention, inline=True)
             embed.add_field(name="To", value=after.channel.mention, inline=True)
@@ -1551,23 +1934,52 @@ class AutoLoggerCog(commands.Cog):
             embed = discord.Embed(
                 title="📹 Started Streaming",
                 description=f"{member.mention} started streaming in {after.channel.mention}",
-                color=discord.Color.purple(),
-                timestamp=discord.utils.utcnow()
+                color=_COLOR_PURPLE
             )
         
         if embed:
+            embed.timestamp = discord.utils.utcnow()
             embed.set_thumbnail(url=member.display_avatar.url)
             embed.set_footer(text=f"User ID: {member.id}")
             await self.send_log(member.guild.id, 'voice', embed)
     
     # === MODERATION EVENTS ===
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry) -> None:
+        """Remember ban entries so the ban log can skip its audit log fetch."""
+        if entry.action is not discord.AuditLogAction.ban or entry.target is None:
+            return
+        
+        now = time.monotonic()
+        for key in [key for key, (seen, _) in self._ban_entries.items() if now - seen > AUDIT_CACHE_TTL]:
+            del self._ban_entries[key]
+        self._ban_entries[(entry.guild.id, entry.target.id)] = (now, entry)
+    
+    async def _get_ban_entry(self, guild: discord.Guild, user: discord.User) -> Optional[discord.AuditLogEntry]:
+        """Return the audit entry for a ban, preferring the gateway-pushed copy."""
+        cached = self._ban_entries.pop((guild.id, user.id), None)
+        if cached and time.monotonic() - cached[0] <= AUDIT_CACHE_TTL:
+            return cached[1]
+        
+        # Without the permission the request can only 403
+        if not guild.me.guild_permissions.view_audit_log:
+            return None
+        
+        async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.ban):
+            if entry.target.id == user.id:
+                return entry
+        return None
+    
     @commands.Cog.listener()
     async def on_member_ban(self, guild: discord.Guild, user: discord.User) -> None:
         """Log bans."""
+        if self.bot.get_log_channel(guild.id, 'moderation') is None:
+            return
+        
         embed = discord.Embed(
             title="🔨 Member Banned",
             description=f"{user.mention} was banned from the server",
-            color=discord.Color.dark_red(),
+            color=_COLOR_DARK_RED,
             timestamp=discord.utils.utcnow()
         )
         embed.set_thumbnail(url=user.display_avatar.url)
@@ -1575,24 +1987,27 @@ class AutoLoggerCog(commands.Cog):
         
         # Try to get ban reason from audit log
         try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.ban):
-                if entry.target.id == user.id:
-                    embed.add_field(name="Banned by", value=entry.user.mention, inline=True)
-                    if entry.reason:
-                        embed.add_field(name="Reason", value=entry.reason, inline=True)
-                    break
-        except:
-            pass
+            entry = await self._get_ban_entry(guild, user)
+            if entry:
+                moderator = entry.user.mention if entry.user else f"<@{entry.user_id}>"
+                embed.add_field(name="Banned by", value=moderator, inline=True)
+                if entry.reason:
+                    embed.add_field(name="Reason", value=entry.reason, inline=True)
+        except discord.HTTPException as e:
+            logger.error(f"Failed to fetch ban audit entry: {e}")
         
         await self.send_log(guild.id, 'moderation', embed)
     
     @commands.Cog.listener()
     async def on_member_unban(self, guild: discord.Guild, user: discord.User) -> None:
         """Log unbans."""
+        if self.bot.get_log_channel(guild.id, 'moderation') is None:
+            return
+        
         embed = discord.Embed(
             title="✅ Member Unbanned",
             description=f"{user.mention} was unbanned",
-            color=discord.Color.green(),
+            color=_COLOR_GREEN,
             timestamp=discord.utils.utcnow()
         )
         embed.set_thumbnail(url=user.display_avatar.url)
@@ -1604,10 +2019,13 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
         """Log channel creation."""
+        if self.bot.get_log_channel(channel.guild.id, 'channels') is None:
+            return
+        
         embed = discord.Embed(
             title="➕ Channel Created",
             description=f"New channel: {channel.mention}",
-            color=discord.Color.green(),
+            color=_COLOR_GREEN,
             timestamp=discord.utils.utcnow()
         )
         embed.add_field(name="Type", value=str(channel.type), inline=True)
@@ -1618,10 +2036,13 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
         """Log channel deletion."""
+        if self.bot.get_log_channel(channel.guild.id, 'channels') is None:
+            return
+        
         embed = discord.Embed(
             title="❌ Channel Deleted",
             description=f"Deleted: **{channel.name}**",
-            color=discord.Color.red(),
+            color=_COLOR_RED,
             timestamp=discord.utils.utcnow()
         )
         embed.add_field(name="Type", value=str(channel.type), inline=True)
@@ -1632,6 +2053,9 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel) -> None:
         """Log channel updates."""
+        if self.bot.get_log_channel(after.guild.id, 'channels') is None:
+            return
+        
         changes = []
         
         if before.name != after.name:
@@ -1644,7 +2068,7 @@ class AutoLoggerCog(commands.Cog):
             embed = discord.Embed(
                 title="✏️ Channel Updated",
                 description=f"Changes to {after.mention}",
-                color=discord.Color.blue(),
+                color=_COLOR_BLUE,
                 timestamp=discord.utils.utcnow()
             )
             embed.add_field(name="Changes", value='\n'.join(changes), inline=False)
@@ -1655,10 +2079,13 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_role_create(self, role: discord.Role) -> None:
         """Log role creation."""
+        if self.bot.get_log_channel(role.guild.id, 'roles') is None:
+            return
+        
         embed = discord.Embed(
             title="🎭 Role Created",
             description=f"New role: {role.mention}",
-            color=role.color or discord.Color.green(),
+            color=role.color or _COLOR_GREEN,
             timestamp=discord.utils.utcnow()
         )
         embed.add_field(name="Role ID", value=f"`{role.id}`", inline=True)
@@ -1669,10 +2096,13 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role: discord.Role) -> None:
         """Log role deletion."""
+        if self.bot.get_log_channel(role.guild.id, 'roles') is None:
+            return
+        
         embed = discord.Embed(
             title="❌ Role Deleted",
             description=f"Deleted: **{role.name}**",
-            color=discord.Color.red(),
+            color=_COLOR_RED,
             timestamp=discord.utils.utcnow()
         )
         embed.add_field(name="Role ID", value=f"`{role.id}`", inline=True)
@@ -1683,6 +2113,9 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_update(self, before: discord.Guild, after: discord.Guild) -> None:
         """Log server updates."""
+        if self.bot.get_log_channel(after.id, 'server') is None:
+            return
+        
         changes = []
         
         if before.name != after.name:
@@ -1704,7 +2137,7 @@ class AutoLoggerCog(commands.Cog):
             embed = discord.Embed(
                 title="⚙️ Server Updated",
                 description='\n'.join(changes),
-                color=discord.Color.blue(),
+                color=_COLOR_BLUE,
                 timestamp=discord.utils.utcnow()
             )
             
@@ -1714,14 +2147,20 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_emojis_update(self, guild: discord.Guild, before: List[discord.Emoji], after: List[discord.Emoji]) -> None:
         """Log emoji updates."""
-        added = [e for e in after if e not in before]
-        removed = [e for e in before if e not in after]
+        if self.bot.get_log_channel(guild.id, 'server') is None:
+            return
+        
+        # Diff on id sets; keep emoji order for display
+        before_ids = {e.id for e in before}
+        after_ids = {e.id for e in after}
+        added = [e for e in after if e.id not in before_ids]
+        removed = [e for e in before if e.id not in after_ids]
         
         if added:
             embed = discord.Embed(
                 title="😀 Emoji Added",
                 description='\n'.join([f"{e} `:{e.name}:`" for e in added]),
-                color=discord.Color.green(),
+                color=_COLOR_GREEN,
                 timestamp=discord.utils.utcnow()
             )
             await self.send_log(guild.id, 'server', embed)
@@ -1730,7 +2169,7 @@ class AutoLoggerCog(commands.Cog):
             embed = discord.Embed(
                 title="❌ Emoji Removed",
                 description='\n'.join([f"`:{e.name}:`" for e in removed]),
-                color=discord.Color.red(),
+                color=_COLOR_RED,
                 timestamp=discord.utils.utcnow()
             )
             await self.send_log(guild.id, 'server', embed)
@@ -1739,10 +2178,13 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_invite_create(self, invite: discord.Invite) -> None:
         """Log invite creation."""
+        if self.bot.get_log_channel(invite.guild.id, 'server') is None:
+            return
+        
         embed = discord.Embed(
             title="🔗 Invite Created",
             description=f"New invite: `{invite.code}`",
-            color=discord.Color.green(),
+            color=_COLOR_GREEN,
             timestamp=discord.utils.utcnow()
         )
         embed.add_field(name="Created by", value=invite.inviter.mention if invite.inviter else "Unknown", inline=True)
@@ -1757,10 +2199,13 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_invite_delete(self, invite: discord.Invite) -> None:
         """Log invite deletion."""
+        if self.bot.get_log_channel(invite.guild.id, 'server') is None:
+            return
+        
         embed = discord.Embed(
             title="🗑️ Invite Deleted",
             description=f"Deleted: `{invite.code}`",
-            color=discord.Color.red(),
+            color=_COLOR_RED,
             timestamp=discord.utils.utcnow()
         )
         
@@ -1770,10 +2215,13 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_thread_create(self, thread: discord.Thread) -> None:
         """Log thread creation."""
+        if self.bot.get_log_channel(thread.guild.id, 'channels') is None:
+            return
+        
         embed = discord.Embed(
             title="🧵 Thread Created",
             description=f"New thread: {thread.mention}",
-            color=discord.Color.green(),
+            color=_COLOR_GREEN,
             timestamp=discord.utils.utcnow()
         )
         embed.add_field(name="Created by", value=thread.owner.mention if thread.owner else "Unknown", inline=True)
@@ -1784,10 +2232,13 @@ class AutoLoggerCog(commands.Cog):
     @commands.Cog.listener()
     async def on_thread_delete(self, thread: discord.Thread) -> None:
         """Log thread deletion."""
+        if self.bot.get_log_channel(thread.guild.id, 'channels') is None:
+            return
+        
         embed = discord.Embed(
             title="🗑️ Thread Deleted",
             description=f"Deleted: **{thread.name}**",
-            color=discord.Color.red(),
+            color=_COLOR_RED,
             timestamp=discord.utils.utcnow()
         )
         
@@ -1803,34 +2254,49 @@ class AutoLoggerCog(commands.Cog):
         channel = messages[0].channel
         guild = messages[0].guild
         
+        if self.bot.get_log_channel(guild.id, 'messages') is None:
+            return
+        
         embed = discord.Embed(
             title="🗑️ Bulk Message Delete",
             description=f"**{len(messages)}** messages deleted in {channel.mention}",
-            color=discord.Color.dark_red(),
+            color=_COLOR_DARK_RED,
             timestamp=discord.utils.utcnow()
         )
         
         # Show some message previews
-        preview = []
-        for msg in messages[:5]:
-            if msg.content:
-                preview.append(f"**{msg.author}:** {msg.content[:50]}...")
-        
+        preview = '\n'.join([f"**{msg.author}:** {msg.content[:50]}..." for msg in islice(messages, 5) if msg.content])
         if preview:
-            embed.add_field(name="Sample Messages", value='\n'.join(preview), inline=False)
+            embed.add_field(name="Sample Messages", value=preview, inline=False)
         
         await self.send_log(guild.id, 'messages', embed)
 
+# Link and invite auto-mod rules share one pattern; invites are listed first so they win over plain links
+_AUTOMOD_LINK_RE = re.compile(
+    r'(?P<invites>(?:https?://)?(?:www\.)?discord(?:\.gg|(?:app)?\.com/invite)/[\w-]+)'
+    r'|(?P<links>https?://\S+)',
+    re.IGNORECASE
+)
+AUTOMOD_TIMEOUT = timedelta(minutes=5)
+
 class AutomationCog(commands.Cog):
     """Advanced automation features."""
     
     def __init__(self, bot: ModernBot) -> None:
         self.bot = bot
-        self.welcome_config = {}  # guild_id: {channel_id, message}
-        self.auto_roles = {}  # guild_id: [role_ids]
+        self.welcome_config = {}  # guild_id: {channel, message}
+        self.auto_roles: Dict[int, List[discord.Role]] = {}  # guild_id: [roles]
         self.auto_responses = {}  # guild_id: {trigger: response}
+        self._auto_response_patterns: Dict[int, Tuple[re.Pattern, Dict[str, int]]] = {}  # guild_id: (trigger alternation, trigger ranks)
         self.automod_config = {}  # guild_id: {rules}
     
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        """Drop automation settings for a guild the bot has left."""
+        for config in (self.welcome_config, self.auto_roles, self.auto_responses,
+                       self._auto_response_patterns, self.automod_config):
+            config.pop(guild.id, None)
+    
     @app_commands.command(name="autowelcome", description="Setup automatic welcome messages")
     @app_commands.describe(
         channel="Channel to send welcome messages",
@@ -1840,7 +2306,7 @@ class AutomationCog(commands.Cog):
     async def autowelcome(self, interaction: discord.Interaction, channel: discord.TextChannel, message: str) -> None:
         """Configure auto-welcome messages."""
         self.welcome_config[interaction.guild_id] = {
-            'channel_id': channel.id,
+            'channel': channel,
             'message': message
         }
         
@@ -1850,7 +2316,7 @@ class AutomationCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Auto-Welcome Configured",
             description="New members will receive this message:",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(name="Channel", value=channel.mention, inline=False)
         embed.add_field(name="Preview", value=preview, inline=False)
@@ -1863,35 +2329,40 @@ class AutomationCog(commands.Cog):
         guild_id = member.guild.id
         
         # Welcome message
-        if guild_id in self.welcome_config:
-            config = self.welcome_config[guild_id]
-            channel = self.bot.get_channel(config['channel_id'])
-            if channel:
-                message = config['message'].replace('{user}', member.mention).replace('{server}', member.guild.name)
-                
-                embed = discord.Embed(
-                    title=f"👋 Welcome to {member.guild.name}!",
-                    description=message,
-                    color=discord.Color.green()
-                )
-                embed.set_thumbnail(url=member.display_avatar.url)
-                embed.set_footer(text=f"Member #{member.guild.member_count}")
-                
-                await channel.send(content=member.mention, embed=embed)
-        
-        # Auto-roles
-        if guild_id in self.auto_roles:
-            roles_to_add = []
-            for role_id in self.auto_roles[guild_id]:
-                role = member.guild.get_role(role_id)
-                if role:
-                    roles_to_add.append(role)
+        config = self.welcome_config.get(guild_id)
+        if config:
+            message = config['message'].replace('{user}', member.mention).replace('{server}', member.guild.name)
             
-            if roles_to_add:
-                try:
-                    await member.add_roles(*roles_to_add, reason="Auto-role on join")
-                except Exception as e:
-                    logger.error(f"Failed to add auto-roles: {e}")
+            embed = discord.Embed(
+                title=f"👋 Welcome to {member.guild.name}!",
+                description=message,
+                color=_COLOR_GREEN
+            )
+            embed.set_thumbnail(url=member.display_avatar.url)
+            embed.set_footer(text=f"Member #{member.guild.member_count}")
+            
+            try:
+                await config['channel'].send(content=member.mention, embed=embed)
+            except discord.NotFound:
+                # Welcome channel was deleted; stop trying until reconfigured
+                self.welcome_config.pop(guild_id, None)
+            except discord.HTTPException as e:
+                logger.error(f"Failed to send welcome message: {e}")
+        
+        # Auto-roles (deleted roles are pruned by on_guild_role_delete)
+        roles_to_add = self.auto_roles.get(guild_id)
+        if roles_to_add:
+            try:
+                await member.add_roles(*roles_to_add, reason="Auto-role on join")
+            except Exception as e:
+                logger.error(f"Failed to add auto-roles: {e}")
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        """Stop auto-assigning a role once it is deleted."""
+        roles = self.auto_roles.get(role.guild.id)
+        if roles and role in roles:
+            roles.remove(role)
     
     @app_commands.command(name="autorole", description="Auto-assign roles when members join")
     @app_commands.describe(role="Role to automatically assign")
@@ -1900,14 +2371,13 @@ class AutomationCog(commands.Cog):
         """Configure auto-roles."""
         guild_id = interaction.guild_id
         
-        if guild_id not in self.auto_roles:
-            self.auto_roles[guild_id] = []
+        roles = self.auto_roles.setdefault(guild_id, [])
         
-        if role.id in self.auto_roles[guild_id]:
-            self.auto_roles[guild_id].remove(role.id)
+        if role in roles:
+            roles.remove(role)
             await interaction.response.send_message(f"❌ Removed {role.mention} from auto-roles", ephemeral=True)
         else:
-            self.auto_roles[guild_id].append(role.id)
+            roles.append(role)
             await interaction.response.send_message(f"✅ Added {role.mention} to auto-roles", ephemeral=True)
     
     @app_commands.command(name="autoresponse", description="Setup automatic responses to keywords")
@@ -1924,29 +2394,77 @@ class AutomationCog(commands.Cog):
             self.auto_responses[guild_id] = {}
         
         self.auto_responses[guild_id][trigger.lower()] = response
+        # One pattern per guild scans each message once, however many triggers exist;
+        # the lookahead reports overlapping matches so configured order can decide
+        triggers = self.auto_responses[guild_id]
+        self._auto_response_patterns[guild_id] = (
+            re.compile(f"(?=({'|'.join(map(re.escape, triggers))}))"),
+            {t: i for i, t in enumerate(triggers)}
+        )
         
         embed = discord.Embed(
             title="✅ Auto-Response Added",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(name="Trigger", value=f"`{trigger}`", inline=True)
         embed.add_field(name="Response", value=response, inline=True)
         
         await interaction.response.send_message(embed=embed)
     
+    async def _enforce_automod(self, message: discord.Message, rules: Dict[str, str]) -> bool:
+        """Apply the configured link/invite rule to a message; return True if it was actioned."""
+        # Staff are never filtered; bots (including this one) are skipped by on_message
+        author = message.author
+        if author.id == message.guild.owner_id:
+            return False
+        perms = author.guild_permissions
+        if perms.administrator or perms.manage_messages:
+            return False
+        
+        for match in _AUTOMOD_LINK_RE.finditer(message.content):
+            # An invite is also a link, so it falls back to the links rule
+            rule = match.lastgroup if match.lastgroup in rules else 'links'
+            action = rules.get(rule)
+            if action is not None:
+                break
+        else:
+            return False
+        
+        reason = f"Auto-mod: {rule}"
+        try:
+            await message.delete()
+            if action == 'warn':
+                await message.channel.send(f"⚠️ {message.author.mention}, {rule} are not allowed here.", delete_after=10)
+            elif action == 'timeout':
+                await message.author.timeout(AUTOMOD_TIMEOUT, reason=reason)
+            elif action == 'kick':
+                await message.author.kick(reason=reason)
+        except discord.HTTPException as e:
+            logger.error(f"Failed to apply auto-mod {action}: {e}")
+        return True
+    
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
-        """Handle auto-responses."""
+        """Handle auto-moderation and auto-responses."""
         if message.author.bot or not message.guild:
             return
         
-        guild_id = message.guild.id
-        if guild_id in self.auto_responses:
-            content_lower = message.content.lower()
-            for trigger, response in self.auto_responses[guild_id].items():
-                if trigger in content_lower:
-                    await message.reply(response, mention_author=False)
-                    break
+        rules = self.automod_config.get(message.guild.id)
+        if rules and ('links' in rules or 'invites' in rules):
+            if await self._enforce_automod(message, rules):
+                return
+        
+        compiled = self._auto_response_patterns.get(message.guild.id)
+        if compiled is None:
+            return
+        
+        # The earliest-configured trigger wins, as with the old per-trigger loop
+        pattern, ranks = compiled
+        found = (m.group(1) for m in pattern.finditer(message.content.lower()))
+        trigger = min(found, key=ranks.__getitem__, default=None)
+        if trigger is not None:
+            response = self.auto_responses[message.guild.id][trigger]
+            await message.reply(response, mention_author=False)
     
     @app_commands.command(name="automod", description="Configure auto-moderation rules")
     @app_commands.describe(
@@ -1971,11 +2489,155 @@ class AutomationCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Auto-Mod Configured",
             description=f"**Rule:** {rule_type}\n**Action:** {action}",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         
         await interaction.response.send_message(embed=embed)
 
+class EmbedModal(discord.ui.Modal, title="Embed Builder"):
+    """Modal collecting the fields for /embed."""
+    
+    embed_title = discord.ui.TextInput(
+        label="Title",
+        placeholder="Enter embed title...",
+        required=True,
+        max_length=256
+    )
+    
+    description = discord.ui.TextInput(
+        label="Description",
+        placeholder="Enter description...",
+        style=discord.TextStyle.paragraph,
+        required=True,
+        max_length=4000
+    )
+    
+    color = discord.ui.TextInput(
+        label="Color (hex code)",
+        placeholder="#5865F2",
+        required=False,
+        max_length=7
+    )
+    
+    footer = discord.ui.TextInput(
+        label="Footer",
+        placeholder="Footer text...",
+        required=False,
+        max_length=2048
+    )
+    
+    async def on_submit(self, interaction: discord.Interaction) -> None:
+        """Post the embed built from the submitted fields."""
+        # Parse color
+        color = _COLOR_BLURPLE
+        if self.color.value:
+            try:
+                color = discord.Color(int(self.color.value.replace('#', ''), 16))
+            except ValueError:
+                pass
+        
+        embed = discord.Embed(
+            title=self.embed_title.value,
+            description=self.description.value,
+            color=color,
+            timestamp=discord.utils.utcnow()
+        )
+        
+        if self.footer.value:
+            embed.set_footer(text=self.footer.value)
+        
+        await interaction.response.send_message(embed=embed)
+
+class RoleSelect(discord.ui.Select):
+    """Role picker for /dropdown; selecting a role toggles it."""
+    
+    def __init__(self, roles: List[discord.Role]) -> None:
+        options = [
+            discord.SelectOption(label=role.name, value=str(role.id), emoji="🎭")
+            for role in roles[:25]  # Max 25 options
+        ]
+        
+        super().__init__(
+            placeholder="Select roles to add/remove...",
+            min_values=1,
+            max_values=len(options),
+            options=options
+        )
+    
+    async def callback(self, interaction: discord.Interaction) -> None:
+        """Toggle each selected role on the member."""
+        member = interaction.user
+        selected_role_ids = [int(value) for value in self.values]
+        
+        added = []
+        removed = []
+        
+        for role_id in selected_role_ids:
+            role = interaction.guild.get_role(role_id)
+            if role:
+                if role in member.roles:
+                    await member.remove_roles(role)
+                    removed.append(role.mention)
+                else:
+                    await member.add_roles(role)
+                    added.append(role.mention)
+        
+        response = []
+        if added:
+            response.append(f"✅ Added: {', '.join(added)}")
+        if removed:
+            response.append(f"❌ Removed: {', '.join(removed)}")
+        
+        await interaction.response.send_message('\n'.join(response), ephemeral=True)
+
+class RoleView(discord.ui.View):
+    """View holding a single RoleSelect."""
+    
+    def __init__(self, roles: List[discord.Role]) -> None:
+        super().__init__(timeout=None)
+        self.add_item(RoleSelect(roles))
+
+# Seconds to coalesce giveaway clicks before refreshing the entry count
+GIVEAWAY_REFRESH_DELAY = 2.0
+
+class GiveawayView(discord.ui.View):
+    """Giveaway entry button that keeps its entries and embed in memory."""
+    
+    def __init__(self, embed: discord.Embed) -> None:
+        super().__init__(timeout=None)
+        self.entries: set[int] = set()
+        self.embed = embed
+        self._shown = 0  # Entry count currently displayed on the message
+        self._refresh: Optional[asyncio.Task] = None
+    
+    @discord.ui.button(label="🎉 Enter Giveaway", style=discord.ButtonStyle.success, custom_id="giveaway_enter")
+    async def enter(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        """Toggle the clicking user's entry."""
+        user_id = interaction.user.id
+        if user_id in self.entries:
+            self.entries.remove(user_id)
+            await interaction.response.send_message("❌ Entry removed!", ephemeral=True)
+        else:
+            self.entries.add(user_id)
+            await interaction.response.send_message("✅ Entry added! Good luck!", ephemeral=True)
+        
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._refresh_entries(interaction.message))
+    
+    async def _refresh_entries(self, message: discord.Message) -> None:
+        """Edit the entry count once per burst of clicks, and only if it changed."""
+        await asyncio.sleep(GIVEAWAY_REFRESH_DELAY)
+        # Clicks during an edit see this task still running and don't schedule
+        # another, so keep going until the latest count has been written
+        while (count := len(self.entries)) != self._shown:
+            self.embed.set_field_at(2, name="📊 Entries", value=str(count), inline=True)
+            try:
+                await message.edit(embed=self.embed)
+            except discord.HTTPException as e:
+                logger.error(f"Failed to update giveaway entries: {e}")
+                return
+            self._shown = count
+
 class ModernInteractionsCog(commands.Cog):
     """Modern Discord interactions - modals, dropdowns, buttons."""
     
@@ -1985,109 +2647,12 @@ class ModernInteractionsCog(commands.Cog):
     @app_commands.command(name="embed", description="Create a custom embed with a builder")
     async def embed_builder(self, interaction: discord.Interaction) -> None:
         """Interactive embed builder with modal."""
-        
-        class EmbedModal(discord.ui.Modal, title="Embed Builder"):
-            embed_title = discord.ui.TextInput(
-                label="Title",
-                placeholder="Enter embed title...",
-                required=True,
-                max_length=256
-            )
-            
-            description = discord.ui.TextInput(
-                label="Description",
-                placeholder="Enter description...",
-                style=discord.TextStyle.paragraph,
-                required=True,
-                max_length=4000
-            )
-            
-            color = discord.ui.TextInput(
-                label="Color (hex code)",
-                placeholder="#5865F2",
-                required=False,
-                max_length=7
-            )
-            
-            footer = discord.ui.TextInput(
-                label="Footer",
-                placeholder="Footer text...",
-                required=False,
-                max_length=2048
-            )
-            
-            async def on_submit(self, interaction: discord.Interaction):
-                # Parse color
-                color = discord.Color.blurple()
-                if self.color.value:
-                    try:
-                        color = discord.Color(int(self.color.value.replace('#', ''), 16))
-                    except:
-                        pass
-                
-                embed = discord.Embed(
-                    title=self.embed_title.value,
-                    description=self.description.value,
-                    color=color,
-                    timestamp=discord.utils.utcnow()
-                )
-                
-                if self.footer.value:
-                    embed.set_footer(text=self.footer.value)
-                
-                await interaction.response.send_message(embed=embed)
-        
         await interaction.response.send_modal(EmbedModal())
     
     @app_commands.command(name="dropdown", description="Create a dropdown menu for role selection")
     @app_commands.checks.has_permissions(manage_roles=True)
     async def dropdown_menu(self, interaction: discord.Interaction) -> None:
         """Create a dropdown role menu."""
-        
-        class RoleSelect(discord.ui.Select):
-            def __init__(self, roles: List[discord.Role]):
-                options = [
-                    discord.SelectOption(label=role.name, value=str(role.id), emoji="🎭")
-                    for role in roles[:25]  # Max 25 options
-                ]
-                
-                super().__init__(
-                    placeholder="Select roles to add/remove...",
-                    min_values=1,
-                    max_values=len(options),
-                    options=options
-                )
-            
-            async def callback(self, interaction: discord.Interaction):
-                member = interaction.user
-                selected_role_ids = [int(value) for value in self.values]
-                
-                added = []
-                removed = []
-                
-                for role_id in selected_role_ids:
-                    role = interaction.guild.get_role(role_id)
-                    if role:
-                        if role in member.roles:
-                            await member.remove_roles(role)
-                            removed.append(role.mention)
-                        else:
-                            await member.add_roles(role)
-                            added.append(role.mention)
-                
-                response = []
-                if added:
-                    response.append(f"✅ Added: {', '.join(added)}")
-                if removed:
-                    response.append(f"❌ Removed: {', '.join(removed)}")
-                
-                await interaction.response.send_message('\n'.join(response), ephemeral=True)
-        
-        class RoleView(discord.ui.View):
-            def __init__(self, roles: List[discord.Role]):
-                super().__init__(timeout=None)
-                self.add_item(RoleSelect(roles))
-        
         # Get assignable roles
         roles = [r for r in interaction.guild.roles if not r.managed and r.name != "@everyone"][:25]
         
@@ -2098,7 +2663,7 @@ class ModernInteractionsCog(commands.Cog):
         embed = discord.Embed(
             title="🎭 Role Selection",
             description="Select roles from the dropdown below!",
-            color=discord.Color.blurple()
+            color=_COLOR_BLURPLE
         )
         
         view = RoleView(roles)
@@ -2114,39 +2679,11 @@ class ModernInteractionsCog(commands.Cog):
         """Start a giveaway with button entries."""
         
         end_time = discord.utils.utcnow() + timedelta(minutes=duration)
-        entries = set()
-        
-        class GiveawayButton(discord.ui.Button):
-            def __init__(self):
-                super().__init__(
-                    label="🎉 Enter Giveaway",
-                    style=discord.ButtonStyle.success,
-                    custom_id="giveaway_enter"
-                )
-            
-            async def callback(self, interaction: discord.Interaction):
-                user_id = interaction.user.id
-                if user_id in entries:
-                    entries.remove(user_id)
-                    await interaction.response.send_message("❌ Entry removed!", ephemeral=True)
-                else:
-                    entries.add(user_id)
-                    await interaction.response.send_message("✅ Entry added! Good luck!", ephemeral=True)
-                
-                # Update embed
-                embed = interaction.message.embeds[0]
-                embed.set_field_at(2, name="📊 Entries", value=str(len(entries)), inline=True)
-                await interaction.message.edit(embed=embed)
-        
-        class GiveawayView(discord.ui.View):
-            def __init__(self):
-                super().__init__(timeout=None)
-                self.add_item(GiveawayButton())
         
         embed = discord.Embed(
             title="🎉 GIVEAWAY 🎉",
             description=f"**Prize:** {prize}\n\nClick the button below to enter!",
-            color=discord.Color.gold(),
+            color=_COLOR_GOLD,
             timestamp=end_time
         )
         embed.add_field(name="🏆 Winners", value=str(winners), inline=True)
@@ -2154,7 +2691,7 @@ class ModernInteractionsCog(commands.Cog):
         embed.add_field(name="📊 Entries", value="0", inline=True)
         embed.set_footer(text="Ends at")
         
-        await interaction.response.send_message(embed=embed, view=GiveawayView())
+        await interaction.response.send_message(embed=embed, view=GiveawayView(embed))
     
     @app_commands.command(name="verify", description="Create a verification system")
     @app_commands.describe(role="Role to give after verification")
@@ -2188,7 +2725,7 @@ class ModernInteractionsCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Verification Required",
             description=f"Click the button below to get the {role.mention} role!",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(name="Why verify?", value="This helps us keep the server safe and organized.", inline=False)
         
@@ -2230,7 +2767,7 @@ class ModernInteractionsCog(commands.Cog):
                 embed = discord.Embed(
                     title="🎫 Support Ticket",
                     description=f"Hello {user.mention}! Support will be with you shortly.",
-                    color=discord.Color.blue()
+                    color=_COLOR_BLUE
                 )
                 embed.add_field(name="Need help?", value="Please describe your issue in detail.", inline=False)
                 
@@ -2245,30 +2782,129 @@ class ModernInteractionsCog(commands.Cog):
         embed = discord.Embed(
             title="🎫 Support Tickets",
             description="Need help? Click the button below to create a support ticket!",
-            color=discord.Color.blue()
+            color=_COLOR_BLUE
         )
         embed.add_field(name="📌 Instructions", value="1. Click the button\n2. Wait for your ticket channel\n3. Describe your issue", inline=False)
         
         view = TicketView(category)
         await interaction.response.send_message(embed=embed, view=view)
 
+# Custom commands are "!trigger", with the trigger ending at the first whitespace
+_CUSTOM_COMMAND_RE = re.compile(r'!(\S+)')
+# User ids pasted into mass actions, either as mentions or as raw snowflakes
+_ID_RE = re.compile(r'<@!?(\d+)>|\b(\d{15,20})\b')
+
+def _parse_ids(text: str) -> List[int]:
+    """Extract unique user ids from mentions and raw ids, in input order."""
+    return list(dict.fromkeys(int(m.group(1) or m.group(2)) for m in _ID_RE.finditer(text)))
+
+async def _get_or_fetch_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """Get a member from the cache, or from the API when member caching is off."""
+    member = guild.get_member(user_id)
+    if member is None and not CACHE_MEMBERS:
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.HTTPException:  # Includes NotFound for users not in the guild
+            return None
+    return member
+
+class RateLimiter:
+    """Token bucket used as `async with limiter:` to pace bursts of REST calls."""
+    
+    __slots__ = ('rate', 'period', '_tokens', '_updated', '_lock')
+    
+    def __init__(self, rate: int, period: float) -> None:
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()  # Waiters are served in arrival order
+    
+    async def __aenter__(self) -> 'RateLimiter':
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return self
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+    
+    async def __aexit__(self, *exc) -> None:
+        return None
+
 class SuperAdvancedCog(commands.Cog):
     """Super advanced features - starboard, suggestions, reminders, etc."""
     
     def __init__(self, bot: ModernBot) -> None:
         self.bot = bot
         self.starboard_config = {}  # guild_id: {channel_id, threshold}
-        self.starboard_messages = {}  # message_id: starboard_message_id
+        self.starboard_messages: OrderedDict[int, int] = OrderedDict()  # message_id: starboard_message_id
+        self._star_counts: OrderedDict[int, int] = OrderedDict()  # message_id: ⭐ count, seeded by one fetch
         self.suggestions = {}  # guild_id: {channel_id}
-        self.reminders = []  # List of reminders
         self.custom_commands = {}  # guild_id: {trigger: response}
-        self.scheduled_messages = []  # List of scheduled messages
-        self.check_reminders.start()
-        self.check_scheduled.start()
+        self._custom_command_max_len: Dict[int, int] = {}  # guild_id: longest trigger
+        # Reminders and scheduled messages share one min-heap of (due, seq, kind, payload)
+        self._timers: List[Tuple[datetime, int, str, dict]] = []
+        self._timer_seq = 0  # Tie-breaker so payload dicts are never compared
+        self._timer_event = asyncio.Event()
+        self._timer_task: Optional[asyncio.Task] = None
+        self._ban_limiter = RateLimiter(BAN_RATE, BAN_RATE_PERIOD)
+    
+    async def cog_load(self) -> None:
+        self._timer_task = asyncio.create_task(self._run_timers())
     
     def cog_unload(self) -> None:
-        self.check_reminders.cancel()
-        self.check_scheduled.cancel()
+        if self._timer_task:
+            self._timer_task.cancel()
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        """Drop per-guild settings for a guild the bot has left."""
+        for config in (self.starboard_config, self.suggestions, self.custom_commands, self._custom_command_max_len):
+            config.pop(guild.id, None)
+    
+    def _add_timer(self, due: datetime, kind: str, payload: dict) -> None:
+        """Queue a reminder or scheduled message and wake the timer task."""
+        self._timer_seq += 1
+        heapq.heappush(self._timers, (due, self._timer_seq, kind, payload))
+        self._timer_event.set()
+    
+    async def _run_timers(self) -> None:
+        """Sleep until the earliest timer is due, then deliver it."""
+        await self.bot.wait_until_ready()
+        while True:
+            self._timer_event.clear()
+            if not self._timers:
+                await self._timer_event.wait()
+                continue
+            
+            delay = (self._timers[0][0] - discord.utils.utcnow()).total_seconds()
+            if delay > 0:
+                # An earlier timer may be added meanwhile; the event cuts the wait short
+                try:
+                    await asyncio.wait_for(self._timer_event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            # Pop everything already due in one go, so a backlog is not re-checked per item
+            now = discord.utils.utcnow()
+            due = []
+            while self._timers and self._timers[0][0] <= now:
+                due.append(heapq.heappop(self._timers))
+            
+            semaphore = asyncio.Semaphore(TIMER_DELIVERY_CONCURRENCY)
+            
+            async def deliver(kind: str, payload: dict) -> None:
+                async with semaphore:
+                    if kind == 'reminder':
+                        await self._send_reminder(payload)
+                    else:
+                        await self._send_scheduled(payload)
+            
+            await asyncio.gather(*(deliver(kind, payload) for _, _, kind, payload in due))
     
     # === STARBOARD ===
     @app_commands.command(name="starboard", description="Setup starboard for popular messages")
@@ -2287,7 +2923,7 @@ class SuperAdvancedCog(commands.Cog):
         embed = discord.Embed(
             title="⭐ Starboard Configured!",
             description=f"Messages with **{threshold}** ⭐ reactions will be posted to {channel.mention}",
-            color=discord.Color.gold()
+            color=_COLOR_GOLD
         )
         
         await interaction.response.send_message(embed=embed)
@@ -2295,36 +2931,40 @@ class SuperAdvancedCog(commands.Cog):
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent) -> None:
         """Handle starboard reactions."""
-        if str(payload.emoji) != '⭐':
+        config = self.starboard_config.get(payload.guild_id)
+        if config is None or payload.emoji.name != '⭐':
             return
         
-        if payload.guild_id not in self.starboard_config:
+        # Don't repost if already on starboard
+        if payload.message_id in self.starboard_messages:
             return
         
-        config = self.starboard_config[payload.guild_id]
-        channel = self.bot.get_channel(payload.channel_id)
+        # Only the first star seen on a message costs a fetch; later ones adjust the local count
+        star_count = self._star_counts.get(payload.message_id)
+        if star_count is not None:
+            star_count += 1
+            self._star_counts[payload.message_id] = star_count
+            self._star_counts.move_to_end(payload.message_id)
+            if star_count < config['threshold']:
+                return
         
+        channel = self.bot.get_channel(payload.channel_id)
         if not channel:
             return
         
         try:
             message = await channel.fetch_message(payload.message_id)
-        except:
-            return
-        
-        # Count star reactions
-        star_count = 0
-        for reaction in message.reactions:
-            if str(reaction.emoji) == '⭐':
-                star_count = reaction.count
-                break
-        
-        if star_count < config['threshold']:
+        except discord.HTTPException:
             return
         
-        # Don't repost if already on starboard
-        if payload.message_id in self.starboard_messages:
-            return
+        if star_count is None:
+            # Unicode reactions carry the emoji as a plain str; custom ones are never ⭐
+            star_count = next((r.count for r in message.reactions if r.emoji == '⭐'), 0)
+            self._star_counts[payload.message_id] = star_count
+            while len(self._star_counts) > STAR_COUNT_CACHE_SIZE:
+                self._star_counts.popitem(last=False)
+            if star_count < config['threshold']:
+                return
         
         starboard_channel = self.bot.get_channel(config['channel_id'])
         if not starboard_channel:
@@ -2333,7 +2973,7 @@ class SuperAdvancedCog(commands.Cog):
         # Create starboard embed
         embed = discord.Embed(
             description=message.content or "*No text content*",
-            color=discord.Color.gold(),
+            color=_COLOR_GOLD,
             timestamp=message.created_at
         )
         embed.set_author(name=message.author.display_name, icon_url=message.author.display_avatar.url)
@@ -2346,6 +2986,15 @@ class SuperAdvancedCog(commands.Cog):
         
         starboard_msg = await starboard_channel.send(embed=embed)
         self.starboard_messages[payload.message_id] = starboard_msg.id
+        if len(self.starboard_messages) > STARBOARD_HISTORY_SIZE:
+            self.starboard_messages.popitem(last=False)
+        self._star_counts.pop(payload.message_id, None)
+    
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent) -> None:
+        """Keep tracked star counts in step with removed stars."""
+        if payload.emoji.name == '⭐' and payload.message_id in self._star_counts:
+            self._star_counts[payload.message_id] -= 1
     
     # === SUGGESTIONS ===
     @app_commands.command(name="setupsuggestions", description="Setup suggestion system")
@@ -2358,7 +3007,7 @@ class SuperAdvancedCog(commands.Cog):
         embed = discord.Embed(
             title="💡 Suggestions System Configured!",
             description=f"Suggestions will be posted to {channel.mention}",
-            color=discord.Color.blue()
+            color=_COLOR_BLUE
         )
         
         await interaction.response.send_message(embed=embed)
@@ -2381,16 +3030,14 @@ class SuperAdvancedCog(commands.Cog):
         embed = discord.Embed(
             title="💡 New Suggestion",
             description=suggestion,
-            color=discord.Color.blue(),
+            color=_COLOR_BLUE,
             timestamp=discord.utils.utcnow()
         )
         embed.set_author(name=interaction.user.display_name, icon_url=interaction.user.display_avatar.url)
         embed.set_footer(text=f"Suggestion by {interaction.user}")
         
         msg = await channel.send(embed=embed)
-        await msg.add_reaction('✅')
-        await msg.add_reaction('❌')
-        await msg.add_reaction('🤷')
+        await asyncio.gather(*(msg.add_reaction(emoji) for emoji in ('✅', '❌', '🤷')))
         
         await interaction.response.send_message("✅ Suggestion submitted!", ephemeral=True)
     
@@ -2404,49 +3051,37 @@ class SuperAdvancedCog(commands.Cog):
         """Set a personal reminder."""
         remind_time = discord.utils.utcnow() + timedelta(minutes=time)
         
-        self.reminders.append({
+        self._add_timer(remind_time, 'reminder', {
             'user_id': interaction.user.id,
             'channel_id': interaction.channel_id,
-            'time': remind_time,
             'reminder': reminder
         })
         
         embed = discord.Embed(
             title="⏰ Reminder Set!",
             description=f"I'll remind you in **{time}** minutes",
-            color=discord.Color.blue()
+            color=_COLOR_BLUE
         )
         embed.add_field(name="Reminder", value=reminder, inline=False)
         embed.add_field(name="Time", value=f"<t:{int(remind_time.timestamp())}:R>", inline=False)
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
     
-    @tasks.loop(seconds=30)
-    async def check_reminders(self) -> None:
-        """Check for due reminders."""
-        now = discord.utils.utcnow()
-        due_reminders = [r for r in self.reminders if r['time'] <= now]
-        
-        for reminder in due_reminders:
-            try:
-                channel = self.bot.get_channel(reminder['channel_id'])
-                user = await self.bot.fetch_user(reminder['user_id'])
-                
-                if channel and user:
-                    embed = discord.Embed(
-                        title="⏰ Reminder!",
-                        description=reminder['reminder'],
-                        color=discord.Color.gold()
-                    )
-                    await channel.send(content=user.mention, embed=embed)
-                
-                self.reminders.remove(reminder)
-            except Exception as e:
-                logger.error(f"Failed to send reminder: {e}")
-    
-    @check_reminders.before_loop
-    async def before_check_reminders(self) -> None:
-        await self.bot.wait_until_ready()
+    async def _send_reminder(self, reminder: dict) -> None:
+        """Deliver a due reminder."""
+        try:
+            channel = self.bot.get_channel(reminder['channel_id'])
+            
+            if channel:
+                embed = discord.Embed(
+                    title="⏰ Reminder!",
+                    description=reminder['reminder'],
+                    color=_COLOR_GOLD
+                )
+                # A mention only needs the id, so the user is never fetched
+                await channel.send(content=f"<@{reminder['user_id']}>", embed=embed)
+        except Exception as e:
+            logger.error(f"Failed to send reminder: {e}")
     
     # === TRANSCRIPT ===
     @app_commands.command(name="transcript", description="Export channel message history")
@@ -2465,56 +3100,51 @@ class SuperAdvancedCog(commands.Cog):
         await interaction.response.defer()
         
         limit = min(limit, 1000)
-        messages = []
-        
-        async for message in interaction.channel.history(limit=limit, oldest_first=True):
-            messages.append(message)
+        now = discord.utils.utcnow()  # Shared by the header and the filename
+        history = interaction.channel.history(limit=limit, oldest_first=True)
+        count = 0
         
+        # Format each message as it arrives instead of holding every Message object first
         if format_type == 'text':
-            content = []
-            content.append(f"Transcript of #{interaction.channel.name}")
-            content.append(f"Exported: {discord.utils.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-            content.append(f"Messages: {len(messages)}")
-            content.append("=" * 50)
-            content.append("")
-            
-            for msg in messages:
+            body = io.BytesIO()
+            async for msg in history:
+                count += 1
                 timestamp = msg.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                content.append(f"[{timestamp}] {msg.author}: {msg.content}")
-                if msg.attachments:
-                    for att in msg.attachments:
-                        content.append(f"  📎 {att.url}")
-                content.append("")
+                body.write(f"[{timestamp}] {msg.author}: {msg.content}\n".encode('utf-8'))
+                for att in msg.attachments:
+                    body.write(f"  📎 {att.url}\n".encode('utf-8'))
+                body.write(b"\n")
             
-            transcript_text = '\n'.join(content)
+            # The header states the count, so it is written once the body is done
+            buffer = io.BytesIO()
+            buffer.write(
+                f"Transcript of #{interaction.channel.name}\n"
+                f"Exported: {now.strftime('%Y-%m-%d %H:%M:%S UTC')}\n"
+                f"Messages: {count}\n"
+                f"{'=' * 50}\n\n".encode('utf-8')
+            )
+            buffer.write(body.getbuffer())
         else:
-            transcript_data = []
-            for msg in messages:
-                transcript_data.append({
+            transcript_data = [
+                {
                     'id': msg.id,
                     'author': str(msg.author),
                     'author_id': msg.author.id,
                     'content': msg.content,
                     'timestamp': msg.created_at.isoformat(),
                     'attachments': [att.url for att in msg.attachments]
-                })
-            transcript_text = json.dumps(transcript_data, indent=2)
-
-        # Save to file
-        filename = f"transcript_{interaction.channel.name}_{discord.utils.utcnow().strftime('%Y%m%d_%H%M%S')}.{'txt' if format_type == 'text' else 'json'}"
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(transcript_text)
-
-        with open(filename, 'rb') as f:
-            file = discord.File(f, filename=filename)
-            await interaction.followup.send(
-                content=f"📄 Exported {len(messages)} messages",
-                file=file
-            )
-
-        # Clean up
-        os.remove(filename)
+                }
+                async for msg in history
+            ]
+            count = len(transcript_data)
+            buffer = io.BytesIO(json.dumps(transcript_data, indent=2).encode('utf-8'))
+        
+        buffer.seek(0)
+        filename = f"transcript_{interaction.channel.name}_{now.strftime('%Y%m%d_%H%M%S')}.{'txt' if format_type == 'text' else 'json'}"
+        await interaction.followup.send(
+            content=f"📄 Exported {count} messages",
+            file=discord.File(buffer, filename=filename)
+        )
     
     # === SCHEDULED MESSAGES ===
     @app_commands.command(name="schedule", description="Schedule a message to be sent later")
@@ -2534,40 +3164,29 @@ class SuperAdvancedCog(commands.Cog):
         """Schedule a message."""
         send_time = discord.utils.utcnow() + timedelta(minutes=minutes)
         
-        self.scheduled_messages.append({
+        self._add_timer(send_time, 'scheduled', {
             'channel_id': channel.id,
-            'time': send_time,
             'message': message
         })
         
         embed = discord.Embed(
             title="📅 Message Scheduled!",
             description=f"Message will be sent to {channel.mention} in **{minutes}** minutes",
-            color=discord.Color.blue()
+            color=_COLOR_BLUE
         )
         embed.add_field(name="Time", value=f"<t:{int(send_time.timestamp())}:F>", inline=False)
         embed.add_field(name="Preview", value=message[:1024], inline=False)
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
     
-    @tasks.loop(seconds=30)
-    async def check_scheduled(self) -> None:
-        """Check for scheduled messages."""
-        now = discord.utils.utcnow()
-        due_messages = [m for m in self.scheduled_messages if m['time'] <= now]
-        
-        for scheduled in due_messages:
-            try:
-                channel = self.bot.get_channel(scheduled['channel_id'])
-                if channel:
-                    await channel.send(scheduled['message'])
-                self.scheduled_messages.remove(scheduled)
-            except Exception as e:
-                logger.error(f"Failed to send scheduled message: {e}")
-    
-    @check_scheduled.before_loop
-    async def before_check_scheduled(self) -> None:
-        await self.bot.wait_until_ready()
+    async def _send_scheduled(self, scheduled: dict) -> None:
+        """Deliver a due scheduled message."""
+        try:
+            channel = self.bot.get_channel(scheduled['channel_id'])
+            if channel:
+                await channel.send(scheduled['message'])
+        except Exception as e:
+            logger.error(f"Failed to send scheduled message: {e}")
     
     # === SERVER BACKUP ===
     @app_commands.command(name="backup", description="Backup server settings (channels, roles)")
@@ -2578,63 +3197,51 @@ class SuperAdvancedCog(commands.Cog):
         
         guild = interaction.guild
         
+        # Split channels from categories in one pass
+        categories, channels = [], []
+        for channel in guild.channels:
+            (categories if isinstance(channel, discord.CategoryChannel) else channels).append(channel)
+        
         backup_data = {
             'name': guild.name,
             'description': guild.description,
             'verification_level': str(guild.verification_level),
-            'roles': [],
-            'channels': [],
-            'categories': []
-        }
-        
-        # Backup roles
-        for role in guild.roles:
-            if role.name != '@everyone':
-                backup_data['roles'].append({
+            'roles': [
+                {
                     'name': role.name,
                     'color': str(role.color),
                     'permissions': role.permissions.value,
                     'hoist': role.hoist,
                     'mentionable': role.mentionable
-                })
-        
-        # Backup channels
-        for channel in guild.channels:
-            if isinstance(channel, discord.CategoryChannel):
-                backup_data['categories'].append({
-                    'name': channel.name,
-                    'position': channel.position
-                })
-            else:
-                backup_data['channels'].append({
+                }
+                for role in guild.roles if role.name != '@everyone'
+            ],
+            'channels': [
+                {
                     'name': channel.name,
                     'type': str(channel.type),
-                    'category': channel.category.name if channel.category else None,
+                    'category': category.name if (category := channel.category) else None,
                     'position': channel.position
-                })
+                }
+                for channel in channels
+            ],
+            'categories': [{'name': category.name, 'position': category.position} for category in categories]
+        }
         
-        # Save to file
+        # Serialize in memory; discord.File uploads from the buffer
         filename = f"backup_{guild.name}_{discord.utils.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, indent=2)
-
-        with open(filename, 'rb') as f:
-            file = discord.File(f, filename=filename)
-
-            embed = discord.Embed(
-                title="💾 Server Backup Created!",
-                description=f"Backup includes:\n"
-                           f"• **{len(backup_data['roles'])}** roles\n"
-                           f"• **{len(backup_data['channels'])}** channels\n"
-                           f"• **{len(backup_data['categories'])}** categories",
-                color=discord.Color.green()
-            )
-
-            await interaction.followup.send(embed=embed, file=file)
-
-        # Clean up
-        os.remove(filename)
+        file = discord.File(io.BytesIO(json.dumps(backup_data, indent=2).encode('utf-8')), filename=filename)
+        
+        embed = discord.Embed(
+            title="💾 Server Backup Created!",
+            description=f"Backup includes:\n"
+                       f"• **{len(backup_data['roles'])}** roles\n"
+                       f"• **{len(backup_data['channels'])}** channels\n"
+                       f"• **{len(backup_data['categories'])}** categories",
+            color=_COLOR_GREEN
+        )
+        
+        await interaction.followup.send(embed=embed, file=file)
     
     # === MASS ACTIONS ===
     @app_commands.command(name="massban", description="Ban multiple users at once")
@@ -2647,21 +3254,25 @@ class SuperAdvancedCog(commands.Cog):
         """Mass ban users."""
         await interaction.response.defer(ephemeral=True)
         
-        ids = user_ids.split()
-        banned = []
-        failed = []
-        
-        for user_id in ids:
-            try:
-                user = await self.bot.fetch_user(int(user_id))
-                await interaction.guild.ban(user, reason=reason)
-                banned.append(str(user))
-            except Exception as e:
-                failed.append(f"{user_id}: {str(e)}")
+        async def ban(user_id: int) -> Optional[str]:
+            """Ban one id, returning an error description on failure."""
+            async with self._ban_limiter:
+                try:
+                    # Any snowflake will do; fetching the user first would double the requests
+                    await interaction.guild.ban(discord.Object(id=user_id), reason=reason)
+                except discord.HTTPException as e:
+                    return f"{user_id}: {str(e)}"
+            return None
+        
+        ids = _parse_ids(user_ids)
+        results = await asyncio.gather(*(ban(user_id) for user_id in ids))
+        # Name users the client already knows, at no extra request; others are listed by id
+        banned = [str(self.bot.get_user(user_id) or user_id) for user_id, error in zip(ids, results) if error is None]
+        failed = [error for error in results if error is not None]
         
         embed = discord.Embed(
             title="🔨 Mass Ban Complete",
-            color=discord.Color.red()
+            color=_COLOR_RED
         )
         
         if banned:
@@ -2688,35 +3299,36 @@ class SuperAdvancedCog(commands.Cog):
         """Mass role assignment."""
         await interaction.response.defer(ephemeral=True)
         
-        # Parse members
-        member_list = []
-        for mention in members.split():
-            try:
-                # Try to extract ID from mention or use as ID directly
-                user_id = int(mention.strip('<@!>'))
-                member = interaction.guild.get_member(user_id)
-                if member:
-                    member_list.append(member)
-            except:
-                pass
-        
-        success = 0
-        failed = 0
-        
-        for member in member_list:
-            try:
-                if action == 'add':
+        # Parse members from mentions or raw ids, ignoring repeats
+        user_ids = _parse_ids(members)
+        adding = action == 'add'
+        semaphore = asyncio.Semaphore(MASS_ACTION_CONCURRENCY)
+        
+        async def apply(user_id: int) -> Optional[bool]:
+            """Return True if the role was changed, False if no change was needed, None if not a member."""
+            async with semaphore:
+                # Without a member cache this is a fetch, so it shares the concurrency limit
+                member = await _get_or_fetch_member(interaction.guild, user_id)
+                if member is None:
+                    return None
+                # Members already in the requested state need no request
+                if (member.get_role(role.id) is None) != adding:
+                    return False
+                if adding:
                     await member.add_roles(role)
                 else:
                     await member.remove_roles(role)
-                success += 1
-            except:
-                failed += 1
+                return True
+        
+        results = await asyncio.gather(*(apply(user_id) for user_id in user_ids), return_exceptions=True)
+        failed = sum(isinstance(r, Exception) for r in results)
+        success = results.count(True)
+        skipped = results.count(False)
         
         embed = discord.Embed(
             title=f"🎭 Mass Role {action.title()}",
-            description=f"**Role:** {role.mention}\n**Success:** {success}\n**Failed:** {failed}",
-            color=discord.Color.green() if failed == 0 else discord.Color.orange()
+            description=f"**Role:** {role.mention}\n**Success:** {success}\n**Skipped:** {skipped}\n**Failed:** {failed}",
+            color=_COLOR_GREEN if failed == 0 else _COLOR_ORANGE
         )
         
         await interaction.followup.send(embed=embed, ephemeral=True)
@@ -2735,12 +3347,14 @@ class SuperAdvancedCog(commands.Cog):
         if guild_id not in self.custom_commands:
             self.custom_commands[guild_id] = {}
         
-        self.custom_commands[guild_id][trigger.lower()] = response
+        trigger = trigger.strip().lower()
+        self.custom_commands[guild_id][trigger] = response
+        self._custom_command_max_len[guild_id] = max(self._custom_command_max_len.get(guild_id, 0), len(trigger))
         
         embed = discord.Embed(
             title="✅ Custom Command Created!",
             description=f"**Trigger:** `!{trigger}`\n**Response:** {response}",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         
         await interaction.response.send_message(embed=embed)
@@ -2751,17 +3365,21 @@ class SuperAdvancedCog(commands.Cog):
         if message.author.bot or not message.guild:
             return
         
-        if not message.content.startswith('!'):
+        guild_commands = self.custom_commands.get(message.guild.id)
+        if not guild_commands:
             return
         
-        guild_id = message.guild.id
-        if guild_id not in self.custom_commands:
+        match = _CUSTOM_COMMAND_RE.match(message.content)
+        if match is None:
             return
         
-        trigger = message.content[1:].split()[0].lower()
+        # Anything longer than every trigger can't match; skip lowercasing it
+        trigger = match.group(1)
+        if len(trigger) > self._custom_command_max_len[message.guild.id]:
+            return
         
-        if trigger in self.custom_commands[guild_id]:
-            response = self.custom_commands[guild_id][trigger]
+        response = guild_commands.get(trigger.lower())
+        if response is not None:
             await message.reply(response)
 
 class ChannelManagementCog(commands.Cog):
@@ -2771,13 +3389,60 @@ class ChannelManagementCog(commands.Cog):
         self.bot = bot
         self.join_to_create = {}  # guild_id: {channel_id, category_id}
         self.temp_channels = {}  # channel_id: owner_id
-        self.channel_templates = {}  # guild_id: {name: template_data}
+        self.channel_templates: Dict[Tuple[int, str], dict] = {}  # (guild_id, name): template_data
         self.stats_channels = {}  # guild_id: {type: channel_id}
+        self._renames = defaultdict(lambda: deque(maxlen=STATS_RENAME_LIMIT))  # channel_id: recent rename times
+        self._member_counts: Dict[int, List[int]] = {}  # guild_id: [bots, online], kept current by member events
+        self._last_stats: Dict[int, tuple] = {}  # guild_id: (channel_ids, values) last fully applied
         self.update_stats.start()
     
     def cog_unload(self) -> None:
         self.update_stats.cancel()
     
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        """Forget temp channels removed by hand instead of by the empty-channel cleanup."""
+        self.temp_channels.pop(channel.id, None)
+        self._renames.pop(channel.id, None)
+    
+    # === MEMBER COUNTERS ===
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        """Reseed member counters after a fresh session, since missed presence changes are not replayed."""
+        self._member_counts.clear()
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self._member_counts.pop(guild.id, None)
+        self._last_stats.pop(guild.id, None)
+    
+    def _adjust_counts(self, member: discord.Member, delta: int) -> None:
+        """Add or remove a member from its guild's counters, if they are being tracked."""
+        counts = self._member_counts.get(member.guild.id)
+        if counts is None:
+            return
+        if member.bot:
+            counts[0] += delta
+        if member.status is not discord.Status.offline:
+            counts[1] += delta
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        self._adjust_counts(member, 1)
+    
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member) -> None:
+        self._adjust_counts(member, -1)
+    
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: discord.Member, after: discord.Member) -> None:
+        counts = self._member_counts.get(after.guild.id)
+        if counts is None:
+            return
+        was_online = before.status is not discord.Status.offline
+        if was_online != (after.status is not discord.Status.offline):
+            counts[1] += -1 if was_online else 1
+    
     # === JOIN TO CREATE ===
     @app_commands.command(name="jointocreate", description="Setup join-to-create voice channels")
     @app_commands.describe(
@@ -2806,7 +3471,7 @@ class ChannelManagementCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Join-to-Create Setup!",
             description=f"When members join {join_channel.mention}, a voice channel will be auto-created for them!",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(name="📁 Category", value=category.name, inline=True)
         embed.add_field(name="🎙️ Join Channel", value=join_channel.mention, inline=True)
@@ -2829,6 +3494,10 @@ class ChannelManagementCog(commands.Cog):
         after: discord.VoiceState
     ) -> None:
         """Handle join-to-create and temp channel cleanup."""
+        # Mute, deafen, stream and video toggles never change the channel
+        if before.channel == after.channel:
+            return
+        
         guild_id = member.guild.id
         
         # Join-to-create
@@ -2866,11 +3535,11 @@ class ChannelManagementCog(commands.Cog):
         
         # Cleanup empty temp channels
         if before.channel and before.channel.id in self.temp_channels:
-            if len(before.channel.members) == 0:
+            if not before.channel.voice_states:  # Voice states don't depend on the member cache
                 try:
                     await before.channel.delete()
-                    del self.temp_channels[before.channel.id]
-                except:
+                    self.temp_channels.pop(before.channel.id, None)
+                except discord.HTTPException:
                     pass
     
     # === TEMPORARY VOICE ===
@@ -2911,7 +3580,7 @@ class ChannelManagementCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Temporary Voice Channel Created!",
             description=f"Created: {channel.mention}",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(name="Owner", value=interaction.user.mention, inline=True)
         embed.add_field(name="User Limit", value=str(user_limit) if user_limit > 0 else "Unlimited", inline=True)
@@ -2947,7 +3616,7 @@ class ChannelManagementCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Channel Cloned!",
             description=f"**Original:** {channel.mention}\n**Clone:** {cloned.mention}",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(
             name="📋 Copied Settings",
@@ -2971,16 +3640,12 @@ class ChannelManagementCog(commands.Cog):
         template_name: str
     ) -> None:
         """Save channel as template."""
-        guild_id = interaction.guild_id
-        
-        if guild_id not in self.channel_templates:
-            self.channel_templates[guild_id] = {}
-        
         # Save channel data
         template_data = {
-            'type': str(channel.type),
+            'type': channel.type.value,
             'name': channel.name,
             'category': channel.category.name if channel.category else None,
+            'category_id': channel.category_id,
             'position': channel.position
         }
         
@@ -2993,12 +3658,12 @@ class ChannelManagementCog(commands.Cog):
             template_data['bitrate'] = channel.bitrate
             template_data['user_limit'] = channel.user_limit
         
-        self.channel_templates[guild_id][template_name] = template_data
+        self.channel_templates[(interaction.guild_id, template_name)] = template_data
         
         embed = discord.Embed(
             title="✅ Template Saved!",
             description=f"Template **{template_name}** created from {channel.mention}",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(name="Use with", value=f"`/loadtemplate {template_name}`", inline=False)
         
@@ -3009,26 +3674,23 @@ class ChannelManagementCog(commands.Cog):
     @app_commands.checks.has_permissions(manage_channels=True)
     async def loadtemplate(self, interaction: discord.Interaction, template_name: str) -> None:
         """Load and create channel from template."""
-        guild_id = interaction.guild_id
-        
-        if guild_id not in self.channel_templates or template_name not in self.channel_templates[guild_id]:
+        template = self.channel_templates.get((interaction.guild_id, template_name))
+        if template is None:
             await interaction.response.send_message("❌ Template not found!", ephemeral=True)
             return
         
         await interaction.response.defer()
         
-        template = self.channel_templates[guild_id][template_name]
-        
-        # Find category if specified
+        # Find category by saved ID, falling back to its name if it was recreated
         category = None
         if template.get('category'):
-            for cat in interaction.guild.categories:
-                if cat.name == template['category']:
-                    category = cat
-                    break
+            category = interaction.guild.get_channel(template['category_id'])
+            if not isinstance(category, discord.CategoryChannel):
+                category = discord.utils.get(interaction.guild.categories, name=template['category'])
         
         # Create channel based on type
-        if 'text' in template['type']:
+        ctype = template['type']
+        if ctype == _TEXT_TYPE:
             channel = await interaction.guild.create_text_channel(
                 name=template['name'],
                 topic=template.get('topic'),
@@ -3036,7 +3698,7 @@ class ChannelManagementCog(commands.Cog):
                 nsfw=template.get('nsfw', False),
                 category=category
             )
-        elif 'voice' in template['type']:
+        elif ctype in _VOICE_TYPES:
             channel = await interaction.guild.create_voice_channel(
                 name=template['name'],
                 bitrate=template.get('bitrate', 64000),
@@ -3050,7 +3712,7 @@ class ChannelManagementCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Channel Created from Template!",
             description=f"Created {channel.mention} from template **{template_name}**",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         
         await interaction.followup.send(embed=embed)
@@ -3075,7 +3737,7 @@ class ChannelManagementCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Auto-Category System Setup!",
             description=f"Created category: **{category.name}**",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(
             name="🔄 How it works",
@@ -3104,16 +3766,7 @@ class ChannelManagementCog(commands.Cog):
         guild = interaction.guild
         
         # Calculate stat
-        stat_names = {
-            'members': ('Members', guild.member_count),
-            'bots': ('Bots', len([m for m in guild.members if m.bot])),
-            'online': ('Online', len([m for m in guild.members if m.status != discord.Status.offline])),
-            'channels': ('Channels', len(guild.channels)),
-            'roles': ('Roles', len(guild.roles)),
-            'boosts': ('Boosts', guild.premium_subscription_count or 0)
-        }
-        
-        name, value = stat_names[stat_type]
+        name, value = self._stat_values(guild)[stat_type]
         
         # Create voice channel (can't be joined, just displays info)
         channel = await guild.create_voice_channel(
@@ -3132,43 +3785,78 @@ class ChannelManagementCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Live Stats Channel Created!",
             description=f"Channel: {channel.mention}\n\nUpdates automatically every 5 minutes!",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         
         await interaction.followup.send(embed=embed)
     
+    def _stat_values(self, guild: discord.Guild) -> Dict[str, Tuple[str, int]]:
+        """Get every stats-channel value for a guild, seeding its member counters on first use."""
+        counts = self._member_counts.get(guild.id)
+        if counts is None:
+            counts = [0, 0]
+            for m in guild.members:
+                if m.bot:
+                    counts[0] += 1
+                if m.status is not discord.Status.offline:
+                    counts[1] += 1
+            self._member_counts[guild.id] = counts
+        bots, online = counts
+        
+        return {
+            'members': ('Members', guild.member_count),
+            'bots': ('Bots', bots),
+            'online': ('Online', online),
+            'channels': ('Channels', len(guild.channels)),
+            'roles': ('Roles', len(guild.roles)),
+            'boosts': ('Boosts', guild.premium_subscription_count or 0)
+        }
+    
     @tasks.loop(minutes=5)
     async def update_stats(self) -> None:
         """Update stats channels."""
-        for guild_id, stats in self.stats_channels.items():
+        for guild_id, stats in list(self.stats_channels.items()):
             guild = self.bot.get_guild(guild_id)
             if not guild:
                 continue
             
+            # Computed once per guild, not once per stats channel; an idle
+            # guild whose names already show these values is skipped outright
+            stat_values = self._stat_values(guild)
+            snapshot = (tuple(stats.values()), tuple(value for _, value in stat_values.values()))
+            if self._last_stats.get(guild_id) == snapshot:
+                continue
+            
+            synced = True
             for stat_type, channel_id in stats.items():
                 channel = guild.get_channel(channel_id)
                 if not channel:
                     continue
                 
-                # Calculate new value
-                stat_values = {
-                    'members': ('Members', guild.member_count),
-                    'bots': ('Bots', len([m for m in guild.members if m.bot])),
-                    'online': ('Online', len([m for m in guild.members if m.status != discord.Status.offline])),
-                    'channels': ('Channels', len(guild.channels)),
-                    'roles': ('Roles', len(guild.roles)),
-                    'boosts': ('Boosts', guild.premium_subscription_count or 0)
-                }
-                
                 if stat_type in stat_values:
                     name, value = stat_values[stat_type]
                     new_name = f"📊 {name}: {value}"
                     
-                    if channel.name != new_name:
-                        try:
-                            await channel.edit(name=new_name)
-                        except:
-                            pass
+                    if channel.name == new_name:
+                        continue
+                    
+                    # Skip until the next tick rather than letting the edit
+                    # block this loop on the rename bucket's 429
+                    renames = self._renames[channel.id]
+                    now = time.monotonic()
+                    if len(renames) == STATS_RENAME_LIMIT and now - renames[0] < STATS_RENAME_WINDOW:
+                        synced = False
+                        continue
+                    
+                    try:
+                        await channel.edit(name=new_name)
+                        renames.append(now)
+                    except discord.HTTPException as e:
+                        synced = False
+                        logger.error(f"Failed to update stats channel {channel.id}: {e}")
+            
+            if synced:
+                self._last_stats[guild_id] = snapshot
     
     @update_stats.before_loop
     async def before_update_stats(self) -> None:
@@ -3200,7 +3888,7 @@ class ChannelManagementCog(commands.Cog):
             embed = discord.Embed(
                 title="🔒 Channel Locked",
                 description=f"{channel.mention} has been locked. Members cannot send messages.",
-                color=discord.Color.red()
+                color=_COLOR_RED
             )
         else:
             await channel.set_permissions(
@@ -3212,7 +3900,7 @@ class ChannelManagementCog(commands.Cog):
             embed = discord.Embed(
                 title="🔓 Channel Unlocked",
                 description=f"{channel.mention} has been unlocked. Members can send messages again.",
-                color=discord.Color.green()
+                color=_COLOR_GREEN
             )
         
         await interaction.response.send_message(embed=embed)
@@ -3233,7 +3921,7 @@ class ChannelManagementCog(commands.Cog):
                        "• Delete all messages\n"
                        "• Clone the channel\n"
                        "• Keep all settings",
-            color=discord.Color.orange()
+            color=_COLOR_ORANGE
         )
         
         class ConfirmView(discord.ui.View):
@@ -3264,25 +3952,107 @@ class ChannelManagementCog(commands.Cog):
             embed = discord.Embed(
                 title="💥 Channel Nuked!",
                 description=f"Channel has been nuked and recreated!\n\nAll messages have been cleared.",
-                color=discord.Color.green()
+                color=_COLOR_GREEN
             )
             await new_channel.send(embed=embed)
         else:
             await interaction.edit_original_response(content="❌ Nuke cancelled", embed=None, view=None)
 
+class LevelData:
+    """Per-user leveling state."""
+    
+    __slots__ = ('xp', 'level', 'messages')
+    
+    def __init__(self) -> None:
+        self.xp = 0
+        self.level = 0
+        self.messages = 0
+
+class EconomyData:
+    """Per-user economy state; new users start with 100 cash."""
+    
+    __slots__ = ('balance', 'bank')
+    
+    def __init__(self, balance: int = 100, bank: int = 0) -> None:
+        self.balance = balance
+        self.bank = bank
+
 class InsaneFeaturesCog(commands.Cog):
     """Absolutely insane features - reaction roles, auto-purge, anti-raid, leveling, economy."""
     
     def __init__(self, bot: ModernBot) -> None:
         self.bot = bot
-        self.reaction_roles = {}  # message_id: {emoji: role_id}
+        self.reaction_roles: Dict[Tuple[int, str], int] = {}  # (message_id, emoji): role_id
+        self._rr_msgs: set = set()  # message_ids with any reaction role, for a cheap early reject
         self.auto_purge = {}  # channel_id: {days, running}
         self.anti_raid = {}  # guild_id: {enabled, threshold, action}
-        self.member_levels = defaultdict(lambda: {'xp': 0, 'level': 0, 'messages': 0})
-        self.member_economy = defaultdict(lambda: {'balance': 100, 'bank': 0})
-        self.join_tracker = defaultdict(list)  # guild_id: [timestamps]
+        self.member_levels: defaultdict[int, LevelData] = defaultdict(LevelData)
+        self.member_economy: defaultdict[int, EconomyData] = defaultdict(EconomyData)
+        self.join_tracker = defaultdict(deque)  # guild_id: deque of join timestamps, oldest first
         self.auto_responders = {}  # guild_id: {pattern: response}
         self.purge_tasks = {}
+        self._rr_pending: Dict[Tuple[int, int], Dict[int, bool]] = {}  # (guild_id, user_id): {role_id: add}
+        self._rr_inflight: set = set()  # (guild_id, user_id) keys with an edit in progress
+        self._rr_queue: asyncio.Queue = asyncio.Queue()  # (due, key)
+        self._rr_workers: List[asyncio.Task] = []
+        self._lb_versions: Counter[str] = Counter()  # board_type: bumped by every write that can reorder it
+        self._lb_cache: Dict[Tuple[int, str], Tuple[tuple, float, List[Tuple[int, int]]]] = {}  # (guild_id, board_type): (token, computed, rows)
+        self._dirty_levels: set = set()  # user_ids changed since the last flush
+        self._dirty_economy: set = set()
+        self._levelup_backoff: Dict[int, float] = {}  # channel_id: monotonic time replies resume
+    
+    async def cog_load(self) -> None:
+        await asyncio.to_thread(self._load_data_sync)
+        self.persist_data.start()
+        self._rr_workers = [asyncio.create_task(self._rr_worker()) for _ in range(RR_WORKERS)]
+    
+    async def cog_unload(self) -> None:
+        for task in self._rr_workers:
+            task.cancel()
+        self.persist_data.cancel()
+        await self._flush_data()
+    
+    # === PERSISTENCE ===
+    def _load_data_sync(self) -> None:
+        """Fill the leveling and economy stores from the database."""
+        with sqlite3.connect(DATA_DB) as db:
+            db.execute("CREATE TABLE IF NOT EXISTS levels (user_id INTEGER PRIMARY KEY, xp INTEGER, level INTEGER, messages INTEGER)")
+            db.execute("CREATE TABLE IF NOT EXISTS economy (user_id INTEGER PRIMARY KEY, balance INTEGER, bank INTEGER)")
+            for user_id, xp, level, messages in db.execute("SELECT user_id, xp, level, messages FROM levels"):
+                data = self.member_levels[user_id]
+                data.xp, data.level, data.messages = xp, level, messages
+            for user_id, balance, bank in db.execute("SELECT user_id, balance, bank FROM economy"):
+                self.member_economy[user_id] = EconomyData(balance, bank)
+    
+    @staticmethod
+    def _write_data_sync(levels: List[tuple], economy: List[tuple]) -> None:
+        """Upsert changed rows in one transaction."""
+        with sqlite3.connect(DATA_DB) as db:
+            db.executemany("INSERT OR REPLACE INTO levels VALUES (?, ?, ?, ?)", levels)
+            db.executemany("INSERT OR REPLACE INTO economy VALUES (?, ?, ?)", economy)
+    
+    async def _flush_data(self) -> None:
+        """Write users changed since the last flush; memory stays the source of truth."""
+        if not self._dirty_levels and not self._dirty_economy:
+            return
+        dirty_levels, self._dirty_levels = self._dirty_levels, set()
+        dirty_economy, self._dirty_economy = self._dirty_economy, set()
+        
+        # Snapshot on the event loop so the thread never reads live state
+        levels = [(uid, d.xp, d.level, d.messages) for uid in dirty_levels if (d := self.member_levels.get(uid))]
+        economy = [(uid, d.balance, d.bank) for uid in dirty_economy if (d := self.member_economy.get(uid))]
+        try:
+            await asyncio.to_thread(self._write_data_sync, levels, economy)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to save leveling data: {e}")
+            # Retry these users on the next flush
+            self._dirty_levels |= dirty_levels
+            self._dirty_economy |= dirty_economy
+    
+    @tasks.loop(seconds=DATA_FLUSH_INTERVAL)
+    async def persist_data(self) -> None:
+        """Periodically write behind changed leveling and economy state."""
+        await self._flush_data()
     
     # === REACTION ROLES ===
     @app_commands.command(name="reactionrole", description="Setup reaction roles on any message")
@@ -3303,55 +4073,116 @@ class InsaneFeaturesCog(commands.Cog):
         try:
             msg_id = int(message_id)
             message = await interaction.channel.fetch_message(msg_id)
-        except:
+        except (ValueError, discord.HTTPException):
             await interaction.response.send_message("❌ Invalid message ID!", ephemeral=True)
             return
         
-        if msg_id not in self.reaction_roles:
-            self.reaction_roles[msg_id] = {}
-        
-        self.reaction_roles[msg_id][emoji] = role.id
+        self._rr_msgs.add(msg_id)
+        self.reaction_roles[(msg_id, emoji)] = role.id
         
         # Add reaction to message
         try:
             await message.add_reaction(emoji)
-        except:
+        except discord.HTTPException:
             pass
         
         embed = discord.Embed(
             title="✅ Reaction Role Added!",
             description=f"React with {emoji} on [this message]({message.jump_url}) to get {role.mention}",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         
         await interaction.response.send_message(embed=embed)
     
+    @app_commands.command(name="reactionrole_bulk", description="Setup several reaction roles on a message at once")
+    @app_commands.describe(
+        message_id="ID of the message",
+        pairs="Comma-separated emoji=role pairs, e.g. 🔴=@Red,🟢=Green"
+    )
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def reactionrole_bulk(self, interaction: discord.Interaction, message_id: str, pairs: str) -> None:
+        """Setup several reaction roles with one command."""
+        try:
+            msg_id = int(message_id)
+            message = await interaction.channel.fetch_message(msg_id)
+        except (ValueError, discord.HTTPException):
+            await interaction.response.send_message("❌ Invalid message ID!", ephemeral=True)
+            return
+        
+        guild = interaction.guild
+        mapping: Dict[str, discord.Role] = {}
+        invalid = []
+        for pair in filter(None, (p.strip() for p in pairs.split(','))):
+            emoji, sep, ref = pair.partition('=')
+            emoji, ref = emoji.strip(), ref.strip()
+            role = self._resolve_role(guild, ref) if sep and emoji else None
+            if role:
+                mapping[emoji] = role
+            else:
+                invalid.append(pair)
+        
+        if not mapping:
+            await interaction.response.send_message("❌ No valid emoji=role pairs!", ephemeral=True)
+            return
+        if len(mapping) > MAX_REACTIONS:
+            await interaction.response.send_message(f"❌ A message can have at most {MAX_REACTIONS} reactions!", ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        
+        self._rr_msgs.add(msg_id)
+        self.reaction_roles.update({(msg_id, emoji): role.id for emoji, role in mapping.items()})
+        
+        # Reactions on one message share a rate-limit bucket, so add them in
+        # order and skip any the bot has already placed
+        existing = {str(r.emoji) for r in message.reactions if r.me}
+        for emoji in mapping:
+            if emoji in existing:
+                continue
+            try:
+                await message.add_reaction(emoji)
+            except discord.HTTPException:
+                invalid.append(emoji)
+        
+        embed = discord.Embed(
+            title="✅ Reaction Roles Added!",
+            description=f"Reaction roles on [this message]({message.jump_url}):\n"
+                        + "\n".join(f"{emoji} → {role.mention}" for emoji, role in mapping.items()),
+            color=_COLOR_GREEN
+        )
+        if invalid:
+            embed.add_field(name="⚠️ Skipped", value=", ".join(invalid)[:1024], inline=False)
+        
+        await interaction.followup.send(embed=embed)
+    
+    @staticmethod
+    def _resolve_role(guild: discord.Guild, ref: str) -> Optional[discord.Role]:
+        """Resolve a role from a mention, raw ID or exact name."""
+        match = _ROLE_REF_RE.fullmatch(ref)
+        if match:
+            return guild.get_role(int(match.group(1) or match.group(2)))
+        return discord.utils.get(guild.roles, name=ref.lstrip('@'))
+    
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent) -> None:
         """Handle reaction role assignment."""
         if payload.user_id == self.bot.user.id:
             return
         
-        if payload.message_id not in self.reaction_roles:
+        if payload.message_id not in self._rr_msgs:
             return
         
-        emoji_str = str(payload.emoji)
-        if emoji_str not in self.reaction_roles[payload.message_id]:
+        role_id = self.reaction_roles.get((payload.message_id, str(payload.emoji)))
+        if role_id is None:
             return
         
         guild = self.bot.get_guild(payload.guild_id)
         if not guild:
             return
         
-        role_id = self.reaction_roles[payload.message_id][emoji_str]
-        role = guild.get_role(role_id)
-        member = guild.get_member(payload.user_id)
-        
-        if role and member:
-            try:
-                await member.add_roles(role, reason="Reaction role")
-            except:
-                pass
+        # The member is resolved by the worker, so this also works without a member cache
+        if guild.get_role(role_id):
+            self._queue_role_change(guild.id, payload.user_id, role_id, True)
     
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent) -> None:
@@ -3359,26 +4190,83 @@ class InsaneFeaturesCog(commands.Cog):
         if payload.user_id == self.bot.user.id:
             return
         
-        if payload.message_id not in self.reaction_roles:
+        if payload.message_id not in self._rr_msgs:
             return
         
-        emoji_str = str(payload.emoji)
-        if emoji_str not in self.reaction_roles[payload.message_id]:
+        role_id = self.reaction_roles.get((payload.message_id, str(payload.emoji)))
+        if role_id is None:
             return
         
         guild = self.bot.get_guild(payload.guild_id)
         if not guild:
             return
         
-        role_id = self.reaction_roles[payload.message_id][emoji_str]
-        role = guild.get_role(role_id)
-        member = guild.get_member(payload.user_id)
-        
-        if role and member:
+        # The member is resolved by the worker, so this also works without a member cache
+        if guild.get_role(role_id):
+            self._queue_role_change(guild.id, payload.user_id, role_id, False)
+    
+    def _queue_role_change(self, guild_id: int, user_id: int, role_id: int, add: bool) -> None:
+        """Record a reaction-role change; the latest change per role wins."""
+        key = (guild_id, user_id)
+        changes = self._rr_pending.get(key)
+        if changes is None:
+            changes = self._rr_pending[key] = {}
+            self._rr_queue.put_nowait((asyncio.get_running_loop().time() + RR_COALESCE_WINDOW, key))
+        changes[role_id] = add
+    
+    async def _rr_worker(self) -> None:
+        """Apply each member's coalesced reaction-role changes."""
+        loop = asyncio.get_running_loop()
+        while True:
+            due, key = await self._rr_queue.get()
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            # Another worker is still applying this member's earlier changes; keep them in order
+            if key in self._rr_inflight:
+                self._rr_queue.put_nowait((loop.time() + RR_COALESCE_WINDOW, key))
+                continue
+            
+            changes = self._rr_pending.pop(key, None)
+            guild = self.bot.get_guild(key[0])
+            if not changes or not guild:
+                continue
+            
+            # Claimed before the member lookup, which may await a fetch
+            self._rr_inflight.add(key)
             try:
-                await member.remove_roles(role, reason="Reaction role removed")
-            except:
-                pass
+                await self._apply_role_changes(guild, key[1], changes)
+            finally:
+                self._rr_inflight.discard(key)
+    
+    async def _apply_role_changes(self, guild: discord.Guild, user_id: int, changes: Dict[int, bool]) -> None:
+        """Apply one member's coalesced reaction-role changes."""
+        member = await _get_or_fetch_member(guild, user_id)
+        if not member:
+            return
+        
+        # Only the net change to reaction roles is sent, one role per request:
+        # a full member.edit(roles=...) would revert any role someone else
+        # changed since our cached copy of member.roles was last updated
+        adds = []
+        removes = []
+        for role_id, add in changes.items():
+            held = member.get_role(role_id) is not None
+            if add and not held:
+                role = guild.get_role(role_id)
+                if role:
+                    adds.append(role)
+            elif not add and held:
+                removes.append(discord.Object(role_id))
+        
+        try:
+            if adds:
+                await member.add_roles(*adds, reason="Reaction roles")
+            if removes:
+                await member.remove_roles(*removes, reason="Reaction roles")
+        except discord.HTTPException as e:
+            logger.error(f"Failed to update reaction roles for {member}: {e}")
     
     # === AUTO PURGE ===
     @app_commands.command(name="autopurge", description="Auto-delete messages older than X days")
@@ -3405,7 +4293,7 @@ class InsaneFeaturesCog(commands.Cog):
         embed = discord.Embed(
             title="✅ Auto-Purge Configured!",
             description=f"Messages older than **{days} days** in {channel.mention} will be auto-deleted.",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(name="Check Interval", value=f"Every {interval_hours} hours", inline=True)
         embed.add_field(name="Status", value="🟢 Active", inline=True)
@@ -3420,25 +4308,34 @@ class InsaneFeaturesCog(commands.Cog):
         while channel_id in self.auto_purge and self.auto_purge[channel_id]['running']:
             try:
                 channel = self.bot.get_channel(channel_id)
-                if channel:
-                    days = self.auto_purge[channel_id]['days']
-                    cutoff = discord.utils.utcnow() - timedelta(days=days)
+                config = self.auto_purge[channel_id]
+                now = discord.utils.utcnow()
+                cutoff = now - timedelta(days=config['days'])
+                # Nothing in the channel predates 'oldest', so until it ages past
+                # the cutoff there is nothing to delete and no REST call is made
+                oldest = config.get('oldest')
+                if channel and channel.last_message_id and (oldest is None or oldest < cutoff):
+                    # Bulk-deletes in chunks of 100; discord.py falls back to
+                    # single deletes for messages past Discord's 14-day limit
+                    try:
+                        deleted = await channel.purge(limit=None, before=cutoff, reason="Auto-purge")
+                    except discord.HTTPException as e:
+                        logger.error(f"Auto-purge failed in {channel.name}: {e}")
+                        deleted = ()
                     
-                    deleted = 0
-                    async for message in channel.history(limit=None, after=cutoff):
-                        if message.created_at < cutoff:
-                            try:
-                                await message.delete()
-                                deleted += 1
-                            except:
-                                pass
+                    if deleted:
+                        logger.info(f"Auto-purged {len(deleted)} messages from {channel.name}")
                     
-                    if deleted > 0:
-                        logger.info(f"Auto-purged {deleted} messages from {channel.name}")
+                    # Anything posted after this pass is newer than its start time
+                    config['oldest'] = now
+                    try:
+                        async for message in channel.history(limit=1, oldest_first=True):
+                            config['oldest'] = message.created_at
+                    except discord.HTTPException:
+                        config['oldest'] = None  # Unknown; purge again next time
                 
                 # Wait for interval
-                interval = self.auto_purge[channel_id]['interval']
-                await asyncio.sleep(interval * 3600)
+                await asyncio.sleep(config['interval'] * 3600)
             except Exception as e:
                 logger.error(f"Auto-purge error: {e}")
                 break
@@ -3462,12 +4359,15 @@ class InsaneFeaturesCog(commands.Cog):
         self.anti_raid[interaction.guild_id] = {
             'enabled': enabled,
             'threshold': threshold,
-            'action': action
+            'action': action,
+            'alert_channel_id': None
         }
+        if action == 'alert':
+            self._find_alert_channel(interaction.guild)
         
         embed = discord.Embed(
             title="🛡️ Anti-Raid Protection",
-            color=discord.Color.green() if enabled else discord.Color.red()
+            color=_COLOR_GREEN if enabled else _COLOR_RED
         )
         embed.add_field(name="Status", value="🟢 Enabled" if enabled else "🔴 Disabled", inline=True)
         embed.add_field(name="Threshold", value=f"{threshold} joins/min", inline=True)
@@ -3489,40 +4389,51 @@ class InsaneFeaturesCog(commands.Cog):
             return
         
         now = discord.utils.utcnow()
-        self.join_tracker[guild_id].append(now)
+        joins = self.join_tracker[guild_id]
+        joins.append(now)
         
-        # Remove old timestamps (older than 1 minute)
+        # Remove old timestamps (older than 1 minute); joins arrive in order
         cutoff = now - timedelta(minutes=1)
-        self.join_tracker[guild_id] = [t for t in self.join_tracker[guild_id] if t > cutoff]
+        while joins[0] <= cutoff:
+            joins.popleft()
         
         # Check if threshold exceeded
         threshold = self.anti_raid[guild_id]['threshold']
-        if len(self.join_tracker[guild_id]) > threshold:
+        if len(joins) > threshold:
             action = self.anti_raid[guild_id]['action']
             
             if action == 'kick':
                 try:
                     await member.kick(reason="Anti-raid protection")
-                except:
+                except discord.HTTPException:
                     pass
             elif action == 'ban':
                 try:
                     await member.ban(reason="Anti-raid protection")
-                except:
+                except discord.HTTPException:
                     pass
             elif action == 'alert':
                 # Try to notify admins
-                for channel in member.guild.text_channels:
-                    if channel.permissions_for(member.guild.me).send_messages:
-                        embed = discord.Embed(
-                            title="🚨 Possible Raid Detected!",
-                            description=f"**{len(self.join_tracker[guild_id])}** members joined in the last minute!",
-                            color=discord.Color.red(),
-                            timestamp=discord.utils.utcnow()
-                        )
-                        embed.add_field(name="Latest Join", value=member.mention, inline=True)
-                        await channel.send(embed=embed)
-                        break
+                config = self.anti_raid[guild_id]
+                channel = member.guild.get_channel(config['alert_channel_id'] or 0)
+                if channel is None or not channel.permissions_for(member.guild.me).send_messages:
+                    channel = self._find_alert_channel(member.guild)
+                if channel:
+                    embed = discord.Embed(
+                        title="🚨 Possible Raid Detected!",
+                        description=f"**{len(joins)}** members joined in the last minute!",
+                        color=_COLOR_RED,
+                        timestamp=now
+                    )
+                    embed.add_field(name="Latest Join", value=member.mention, inline=True)
+                    await channel.send(embed=embed)
+    
+    def _find_alert_channel(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """Pick and remember the first text channel the bot can post raid alerts in."""
+        me = guild.me
+        channel = next((c for c in guild.text_channels if c.permissions_for(me).send_messages), None)
+        self.anti_raid[guild.id]['alert_channel_id'] = channel.id if channel else None
+        return channel
     
     # === LEVELING SYSTEM ===
     @app_commands.command(name="rank", description="Check your rank and level")
@@ -3533,8 +4444,8 @@ class InsaneFeaturesCog(commands.Cog):
         data = self.member_levels[member.id]
         
         # Calculate level from XP
-        xp = data['xp']
-        level = data['level']
+        xp = data.xp
+        level = data.level
         xp_for_next = (level + 1) * 100
         
         embed = discord.Embed(
@@ -3545,12 +4456,14 @@ class InsaneFeaturesCog(commands.Cog):
         
         embed.add_field(name="🎯 Level", value=str(level), inline=True)
         embed.add_field(name="⭐ XP", value=f"{xp}/{xp_for_next}", inline=True)
-        embed.add_field(name="💬 Messages", value=str(data['messages']), inline=True)
+        embed.add_field(name="💬 Messages", value=str(data.messages), inline=True)
         
         # Progress bar
-        progress = int((xp / xp_for_next) * 20)
-        bar = "█" * progress + "░" * (20 - progress)
-        embed.add_field(name="Progress", value=f"`{bar}` {int((xp/xp_for_next)*100)}%", inline=False)
+        embed.add_field(
+            name="Progress",
+            value=f"`{_PROGRESS_BARS[xp * 20 // xp_for_next]}` {xp * 100 // xp_for_next}%",
+            inline=False
+        )
         
         await interaction.response.send_message(embed=embed)
     
@@ -3564,54 +4477,40 @@ class InsaneFeaturesCog(commands.Cog):
         """Show leaderboard."""
         guild = interaction.guild
         
-        if board_type in ['level', 'messages']:
-            sorted_members = sorted(
-                [(uid, data) for uid, data in self.member_levels.items()],
-                key=lambda x: x[1][board_type if board_type == 'level' else 'messages'],
-                reverse=True
-            )[:10]
-            
-            embed = discord.Embed(
-                title=f"🏆 Top 10 - {board_type.title()}",
-                color=discord.Color.gold()
-            )
-            
-            for i, (user_id, data) in enumerate(sorted_members, 1):
-                member = guild.get_member(user_id)
-                if member:
-                    value = data['level'] if board_type == 'level' else data['messages']
-                    medal = ["🥇", "🥈", "🥉"][i-1] if i <= 3 else f"#{i}"
-                    embed.add_field(
-                        name=f"{medal} {member.display_name}",
-                        value=f"Level {data['level']}" if board_type == 'level' else f"{data['messages']} messages",
-                        inline=False
-                    )
+        if board_type == 'balance':
+            embed = discord.Embed(title="🏆 Top 10 - Richest", color=_COLOR_GOLD)
+            fmt = "💰 ${:,}"
+        else:
+            embed = discord.Embed(title=f"🏆 Top 10 - {board_type.title()}", color=_COLOR_GOLD)
+            fmt = "Level {}" if board_type == 'level' else "{} messages"
         
-        else:  # balance
-            sorted_members = sorted(
-                [(uid, data) for uid, data in self.member_economy.items()],
-                key=lambda x: x[1]['balance'] + x[1]['bank'],
-                reverse=True
-            )[:10]
-            
-            embed = discord.Embed(
-                title="🏆 Top 10 - Richest",
-                color=discord.Color.gold()
-            )
-            
-            for i, (user_id, data) in enumerate(sorted_members, 1):
-                member = guild.get_member(user_id)
-                if member:
-                    total = data['balance'] + data['bank']
-                    medal = ["🥇", "🥈", "🥉"][i-1] if i <= 3 else f"#{i}"
-                    embed.add_field(
-                        name=f"{medal} {member.display_name}",
-                        value=f"💰 ${total:,}",
-                        inline=False
-                    )
+        for medal, (user_id, value) in zip(_MEDALS, self._leaderboard_rows(guild, board_type)):
+            member = guild.get_member(user_id)
+            if member:
+                embed.add_field(name=f"{medal} {member.display_name}", value=fmt.format(value), inline=False)
         
         await interaction.response.send_message(embed=embed)
     
+    def _leaderboard_rows(self, guild: discord.Guild, board_type: str) -> List[Tuple[int, int]]:
+        """Get a guild's top 10 (user_id, score) rows, reusing them until that board changes."""
+        store = self.member_economy if board_type == 'balance' else self.member_levels
+        key = (guild.id, board_type)
+        # Lookups of new users insert default entries, so the store size is part of the token
+        token = (self._lb_versions[board_type], len(store))
+        now = time.monotonic()
+        cached = self._lb_cache.get(key)
+        if cached and cached[0] == token and now - cached[1] < LEADERBOARD_CACHE_TTL:
+            return cached[2]
+        
+        # Top 10 of this guild's members in O(N log 10), not a full sort
+        if board_type == 'balance':
+            scored = ((uid, data.balance + data.bank) for uid, data in store.items() if guild.get_member(uid))
+        else:
+            scored = ((uid, getattr(data, board_type)) for uid, data in store.items() if guild.get_member(uid))
+        rows = heapq.nlargest(10, scored, key=_SCORE)
+        self._lb_cache[key] = (token, now, rows)
+        return rows
+    
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
         """Award XP for messages."""
@@ -3622,26 +4521,36 @@ class InsaneFeaturesCog(commands.Cog):
         data = self.member_levels[user_id]
 
         # Award XP (5-15 per message)
-        xp_gain = random.randint(5, 15)
-        data['xp'] += xp_gain
-        data['messages'] += 1
+        xp = data.xp + _randint(5, 15)
+        data.xp = xp
+        data.messages += 1
+        self._dirty_levels.add(user_id)
+        self._lb_versions['messages'] += 1
         
         # Check for level up
-        xp_needed = (data['level'] + 1) * 100
-        if data['xp'] >= xp_needed:
-            data['level'] += 1
-            data['xp'] = 0
+        if xp >= (data.level + 1) * 100:
+            data.level += 1
+            data.xp = 0
+            self._lb_versions['level'] += 1
+            
+            # Channels that just refused or rate-limited a level-up reply are skipped for a while
+            channel_id = message.channel.id
+            now = time.monotonic()
+            if self._levelup_backoff.get(channel_id, 0) > now:
+                return
+            self._levelup_backoff.pop(channel_id, None)
             
             # Level up message
             embed = discord.Embed(
                 title="🎉 Level Up!",
-                description=f"{message.author.mention} reached **Level {data['level']}**!",
-                color=discord.Color.gold()
+                description=f"{message.author.mention} reached **Level {data.level}**!",
+                color=_COLOR_GOLD
             )
             try:
                 await message.reply(embed=embed, mention_author=False)
-            except:
-                pass
+            except discord.HTTPException as e:
+                retry_after = e.response.headers.get('Retry-After') if e.status == 429 else None
+                self._levelup_backoff[channel_id] = now + (float(retry_after) if retry_after else LEVELUP_BACKOFF)
     
     # === ECONOMY SYSTEM ===
     @app_commands.command(name="balance", description="Check your balance")
@@ -3653,11 +4562,11 @@ class InsaneFeaturesCog(commands.Cog):
         
         embed = discord.Embed(
             title=f"💰 {member.display_name}'s Balance",
-            color=discord.Color.gold()
+            color=_COLOR_GOLD
         )
-        embed.add_field(name="💵 Cash", value=f"${data['balance']:,}", inline=True)
-        embed.add_field(name="🏦 Bank", value=f"${data['bank']:,}", inline=True)
-        embed.add_field(name="💎 Total", value=f"${data['balance'] + data['bank']:,}", inline=True)
+        embed.add_field(name="💵 Cash", value=f"${data.balance:,}", inline=True)
+        embed.add_field(name="🏦 Bank", value=f"${data.bank:,}", inline=True)
+        embed.add_field(name="💎 Total", value=f"${data.balance + data.bank:,}", inline=True)
         
         await interaction.response.send_message(embed=embed)
     
@@ -3666,15 +4575,17 @@ class InsaneFeaturesCog(commands.Cog):
         """Daily reward."""
         data = self.member_economy[interaction.user.id]
 
-        reward = random.randint(100, 500)
-        data['balance'] += reward
+        reward = _randint(100, 500)
+        data.balance += reward
+        self._dirty_economy.add(interaction.user.id)
+        self._lb_versions['balance'] += 1
         
         embed = discord.Embed(
             title="🎁 Daily Reward!",
             description=f"You received **${reward:,}**!",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
-        embed.add_field(name="New Balance", value=f"${data['balance']:,}", inline=True)
+        embed.add_field(name="New Balance", value=f"${data.balance:,}", inline=True)
         
         await interaction.response.send_message(embed=embed)
     
@@ -3692,19 +4603,21 @@ class InsaneFeaturesCog(commands.Cog):
         
         sender_data = self.member_economy[interaction.user.id]
         
-        if sender_data['balance'] < amount:
+        if sender_data.balance < amount:
             await interaction.response.send_message("❌ Insufficient balance!", ephemeral=True)
             return
         
         receiver_data = self.member_economy[member.id]
         
-        sender_data['balance'] -= amount
-        receiver_data['balance'] += amount
+        sender_data.balance -= amount
+        receiver_data.balance += amount
+        self._dirty_economy.update((interaction.user.id, member.id))
+        self._lb_versions['balance'] += 1
         
         embed = discord.Embed(
             title="💸 Payment Sent!",
             description=f"{interaction.user.mention} paid {member.mention} **${amount:,}**",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         
         await interaction.response.send_message(embed=embed)
@@ -3728,7 +4641,7 @@ class InsaneFeaturesCog(commands.Cog):
         embed = discord.Embed(
             title="⏱️ Slowmode Updated",
             description=f"Slowmode set to **{delay} seconds**" if delay > 0 else "Slowmode disabled",
-            color=discord.Color.blue()
+            color=_COLOR_BLUE
         )
         
         if auto_adjust:
@@ -3753,6 +4666,11 @@ class InsaneFeaturesCog(commands.Cog):
         filter_type: Literal['all', 'humans', 'bots'] = 'all'
     ) -> None:
         """Give role to all members."""
+        # Managed, @everyone, or above-the-bot roles would fail for every member
+        if not role.is_assignable():
+            await interaction.response.send_message(f"❌ I can't assign {role.mention}!", ephemeral=True)
+            return
+        
         await interaction.response.defer()
         
         members = interaction.guild.members
@@ -3762,21 +4680,25 @@ class InsaneFeaturesCog(commands.Cog):
         elif filter_type == 'bots':
             members = [m for m in members if m.bot]
         
-        success = 0
-        failed = 0
+        semaphore = asyncio.Semaphore(MASS_ACTION_CONCURRENCY)
+        reason = f"Role all by {interaction.user}"
         
-        for member in members:
-            if role not in member.roles:
-                try:
-                    await member.add_roles(role, reason=f"Role all by {interaction.user}")
-                    success += 1
-                except:
-                    failed += 1
+        async def assign(member: discord.Member) -> None:
+            async with semaphore:
+                await member.add_roles(role, reason=reason)
+        
+        # get_role is a binary search over the member's sorted role IDs; m.roles builds a list
+        results = await asyncio.gather(
+            *(assign(m) for m in members if m.get_role(role.id) is None),
+            return_exceptions=True
+        )
+        failed = sum(isinstance(r, Exception) for r in results)
+        success = len(results) - failed
         
         embed = discord.Embed(
             title="✅ Mass Role Assignment Complete",
             description=f"Assigned {role.mention} to members",
-            color=discord.Color.green()
+            color=_COLOR_GREEN
         )
         embed.add_field(name="✅ Success", value=str(success), inline=True)
         embed.add_field(name="❌ Failed", value=str(failed), inline=True)
@@ -3791,15 +4713,17 @@ class InsaneFeaturesCog(commands.Cog):
         """Clear all roles from a member."""
         await interaction.response.defer()
         
-        roles_to_remove = [r for r in member.roles if r.name != '@everyone' and not r.managed]
+        # member.roles[0] is always @everyone; managed roles can't be removed
+        roles_to_remove = [r for r in member.roles[1:] if not r.managed]
         
         try:
-            await member.remove_roles(*roles_to_remove, reason=f"Cleared by {interaction.user}")
+            # atomic=False sends one PATCH with the new role list instead of one DELETE per role
+            await member.remove_roles(*roles_to_remove, reason=f"Cleared by {interaction.user}", atomic=False)
             
             embed = discord.Embed(
                 title="✅ Roles Cleared",
                 description=f"Removed **{len(roles_to_remove)}** roles from {member.mention}",
-                color=discord.Color.green()
+                color=_COLOR_GREEN
             )
             
             await interaction.followup.send(embed=embed)
@@ -4,14 +4,37 @@ Modern web interface with Discord OAuth2, live stats, and server management.
 """
 
 import os
+import time
+from collections import Counter, OrderedDict
 from datetime import datetime
-from quart import Quart, render_template, redirect, url_for, session, request, jsonify
+from itertools import islice
+import orjson
+from quart import Quart, Response, render_template, redirect, url_for, session, request, jsonify
+from quart.json.provider import DefaultJSONProvider
 from quart_discord import DiscordOAuth2Session, requires_authorization, Unauthorized
 import discord
 from discord.ext import commands
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, so every jsonify() skips the stdlib encoder."""
+    
+    # Non-str keys are coerced like json.dumps does; keys are not sorted
+    option = orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 # Dashboard configuration
 app = Quart(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 app.config["DISCORD_CLIENT_ID"] = os.getenv("DISCORD_CLIENT_ID")
 app.config["DISCORD_CLIENT_SECRET"] = os.getenv("DISCORD_CLIENT_SECRET")
@@ -23,6 +46,71 @@ discord_oauth = DiscordOAuth2Session(app)
 # Global bot instance (will be set by main bot)
 bot_instance: commands.Bot | None = None
 
+# Members returned by the server members endpoint
+MEMBER_LIST_LIMIT = 100
+
+# Stats payloads are reused for this many seconds to absorb dashboard polling
+STATS_CACHE_TTL = 3.0
+_stats_cache: dict[str, tuple[float, dict]] = {}  # key: (computed, payload)
+
+async def _cached_stats(key: str, compute) -> dict:
+    """Return a recent payload for key, recomputing it once the TTL has passed."""
+    now = time.monotonic()
+    cached = _stats_cache.get(key)
+    if cached and now - cached[0] < STATS_CACHE_TTL:
+        return cached[1]
+    # Cached-member stats never await, so concurrent requests cannot race a
+    # recompute; the REST fallback at worst fetches twice in one window
+    payload = await compute()
+    _stats_cache[key] = (now, payload)
+    return payload
+
+# Confirmed (user, guild) access is trusted for this many seconds
+ACCESS_CACHE_TTL = 30
+ACCESS_CACHE_SIZE = 10000
+_access_cache: OrderedDict[tuple[int, int], float] = OrderedDict()  # key: checked at
+
+async def _accessible_guild(guild_id: int) -> discord.Guild | None:
+    """Get the bot's guild if the logged-in user is also a member of it."""
+    guild = bot_instance.get_guild(guild_id) if bot_instance else None
+    if not guild:
+        return None
+
+    # session user_id is only set once fetch_user() has run, so resolve it
+    # through fetch_user() (served from quart-discord's user cache)
+    user = await discord_oauth.fetch_user()
+    key = (user.id, guild_id)
+    now = time.monotonic()
+    checked = _access_cache.get(key)
+    if checked is not None and now - checked < ACCESS_CACHE_TTL:
+        _access_cache.move_to_end(key)
+        return guild
+
+    # Only grants are cached, so a user who joins later is not locked out
+    if guild_id not in {int(g.id) for g in await discord_oauth.fetch_guilds()}:
+        return None
+    _access_cache[key] = now
+    _access_cache.move_to_end(key)
+    if len(_access_cache) > ACCESS_CACHE_SIZE:
+        _access_cache.popitem(last=False)
+    return guild
+
+# Settings sections the server page saves, and the most a save may send
+SETTINGS_KEYS = frozenset({"autowelcome", "automod", "antiraid"})
+SETTINGS_MAX_BYTES = 4096
+
+async def _can_manage(guild_id: int) -> bool:
+    """Check whether the logged-in user owns or has Manage Server in a guild."""
+    for g in await discord_oauth.fetch_guilds():
+        if int(g.id) == guild_id:
+            perms = g.permissions
+            return bool(g.is_owner or (perms and (perms.administrator or perms.manage_guild)))
+    return False
+
+def _members_enabled() -> bool:
+    """Check whether the bot keeps guild member lists in memory."""
+    return getattr(bot_instance, 'cache_members', True)
+
 def set_bot_instance(bot: commands.Bot):
     """Set the bot instance for the dashboard."""
     global bot_instance
@@ -77,7 +165,7 @@ async def server_dashboard(guild_id: int):
     guilds = await discord_oauth.fetch_guilds()
     
     # Check if user has access to this guild
-    if not any(g.id == str(guild_id) for g in guilds):
+    if guild_id not in {int(g.id) for g in guilds}:
         return "Access Denied", 403
     
     guild = bot_instance.get_guild(guild_id) if bot_instance else None
@@ -93,57 +181,64 @@ async def api_stats():
     if not bot_instance:
         return jsonify({"error": "Bot not connected"}), 503
     
-    stats = {
-        "guilds": len(bot_instance.guilds),
-        "users": sum(g.member_count for g in bot_instance.guilds),
-        "channels": sum(len(g.channels) for g in bot_instance.guilds),
-        "commands": len(bot_instance.tree.get_commands()),
+    return jsonify(await _cached_stats("stats", _bot_stats))
+
+async def _bot_stats() -> dict:
+    """Compute bot-wide statistics."""
+    guilds = bot_instance.guilds
+    return {
+        "guilds": len(guilds),
+        "users": sum(g.member_count for g in guilds),
+        "channels": sum(len(g.channels) for g in guilds),
+        "commands": bot_instance.command_count,
         "latency": round(bot_instance.latency * 1000, 2),
         "uptime": str(datetime.utcnow() - bot_instance.start_time) if hasattr(bot_instance, 'start_time') else "Unknown"
     }
-    
-    return jsonify(stats)
 
 @app.route("/api/server/<int:guild_id>/stats")
 @requires_authorization
 async def api_server_stats(guild_id: int):
     """Get server statistics."""
-    guild = bot_instance.get_guild(guild_id) if bot_instance else None
+    guild = await _accessible_guild(guild_id)
     if not guild:
         return jsonify({"error": "Server not found"}), 404
-
-    # Single pass through members for all stats
-    members = list(guild.members)
-    status_counts = {'online': 0, 'idle': 0, 'dnd': 0, 'offline': 0, 'bots': 0, 'humans': 0}
     
-    for member in members:
-        # Count status
-        if member.status == discord.Status.online:
-            status_counts['online'] += 1
-        elif member.status == discord.Status.idle:
-            status_counts['idle'] += 1
-        elif member.status == discord.Status.dnd:
-            status_counts['dnd'] += 1
-        else:
-            status_counts['offline'] += 1
+    return jsonify(await _cached_stats(f"stats:{guild_id}", lambda: _server_stats(guild)))
+
+async def _server_stats(guild: discord.Guild) -> dict:
+    """Compute statistics for one server."""
+    if _members_enabled():
+        # Single pass through members for all stats; guild.members is already a fresh list
+        status_counts = Counter()
+        bots = 0
+        for member in guild.members:
+            status_counts[member.status] += 1
+            bots += member.bot
         
-        # Count bot/human
-        if member.bot:
-            status_counts['bots'] += 1
-        else:
-            status_counts['humans'] += 1
+        online = status_counts[discord.Status.online]
+        idle = status_counts[discord.Status.idle]
+        dnd = status_counts[discord.Status.dnd]
+        # Anything else (offline, invisible) reports as offline, as before
+        offline = status_counts.total() - online - idle - dnd
+        humans = status_counts.total() - bots
+    else:
+        # Without a member cache only Discord's approximate counts are available
+        counted = await bot_instance.fetch_guild(guild.id, with_counts=True)
+        online = counted.approximate_presence_count
+        offline = counted.approximate_member_count - online
+        idle = dnd = bots = humans = None
 
-    stats = {
+    return {
         "name": guild.name,
         "icon": str(guild.icon.url) if guild.icon else None,
         "members": {
             "total": guild.member_count,
-            "online": status_counts['online'],
-            "idle": status_counts['idle'],
-            "dnd": status_counts['dnd'],
-            "offline": status_counts['offline'],
-            "bots": status_counts['bots'],
-            "humans": status_counts['humans']
+            "online": online,
+            "idle": idle,
+            "dnd": dnd,
+            "offline": offline,
+            "bots": bots,
+            "humans": humans
         },
         "channels": {
             "total": len(guild.channels),
@@ -155,62 +250,99 @@ async def api_server_stats(guild_id: int):
         "emojis": len(guild.emojis),
         "boosts": guild.premium_subscription_count,
         "boost_level": guild.premium_tier,
-        "created_at": guild.created_at.isoformat()
+        "created_at": guild.created_at
     }
 
-    return jsonify(stats)
+def _role_payload(role: discord.Role) -> dict:
+    """Serialize a role for the members list."""
+    return {"id": role.id, "name": role.name, "color": str(role.color)}
 
 @app.route("/api/server/<int:guild_id>/members")
 @requires_authorization
 async def api_server_members(guild_id: int):
     """Get server members list."""
-    guild = bot_instance.get_guild(guild_id) if bot_instance else None
+    guild = await _accessible_guild(guild_id)
     if not guild:
         return jsonify({"error": "Server not found"}), 404
     
-    # Limit to 100 members for performance
-    members = []
-    for member in list(guild.members)[:100]:
-        members.append({
-            "id": member.id,
-            "name": member.name,
-            "display_name": member.display_name,
-            "avatar": str(member.display_avatar.url),
-            "status": str(member.status),
-            "bot": member.bot,
-            "joined_at": member.joined_at.isoformat() if member.joined_at else None,
-            "roles": [{"id": r.id, "name": r.name, "color": str(r.color)} for r in member.roles if r.name != "@everyone"]
-        })
+    # Each role is serialized once and shared by every member holding it
+    role_payloads = {r.id: _role_payload(r) for r in guild.roles if not r.is_default()}
     
-    return jsonify({"members": members, "total": guild.member_count})
+    # Everything that can fail happens before the 200 goes out; an error
+    # mid-stream would leave the client with truncated JSON
+    if _members_enabled():
+        members = list(islice(guild.members, MEMBER_LIST_LIMIT))
+    else:
+        try:
+            # A single request at this limit
+            members = [m async for m in guild.fetch_members(limit=MEMBER_LIST_LIMIT)]
+        except discord.HTTPException:
+            return jsonify({"error": "Failed to fetch members"}), 502
+    
+    async def stream():
+        """Encode the member list one member at a time, so the full payload is never held."""
+        yield b'{"members":['
+        for i, m in enumerate(members):
+            if i:
+                yield b','
+            yield orjson.dumps({
+                "id": m.id,
+                "name": m.name,
+                "display_name": m.display_name,
+                "avatar": str(m.display_avatar.url),
+                "status": str(m.status),
+                "bot": m.bot,
+                "joined_at": m.joined_at,
+                # roles[0] is @everyone; roles created after the snapshot are serialized on the spot
+                "roles": [role_payloads.get(r.id) or _role_payload(r) for r in m.roles[1:]]
+            })
+        yield b'],"total":' + orjson.dumps(guild.member_count) + b'}\n'
+    
+    return Response(stream(), mimetype="application/json")
 
 @app.route("/api/server/<int:guild_id>/config", methods=["GET", "POST"])
 @requires_authorization
 async def api_server_config(guild_id: int):
     """Get or update server configuration."""
+    if not await _accessible_guild(guild_id):
+        return jsonify({"error": "Server not found"}), 404
+    
     if request.method == "GET":
         # Get current config
-        config = bot_instance.config.get(str(guild_id), {}) if bot_instance else {}
-        return jsonify(config)
+        return jsonify(bot_instance.guild_settings.get(guild_id, {}))
     
     elif request.method == "POST":
-        # Update config
-        data = await request.get_json()
-        if bot_instance and hasattr(bot_instance, 'config'):
-            if str(guild_id) not in bot_instance.config:
-                bot_instance.config[str(guild_id)] = {}
-            
-            bot_instance.config[str(guild_id)].update(data)
-            bot_instance.save_config()
-            
-            return jsonify({"success": True, "message": "Configuration updated"})
+        # Update config; membership alone only allows reading
+        if not await _can_manage(guild_id):
+            return jsonify({"error": "Manage Server permission required"}), 403
         
-        return jsonify({"error": "Bot not available"}), 503
+        body = await request.get_data()
+        if len(body) > SETTINGS_MAX_BYTES:
+            return jsonify({"error": "Settings payload too large"}), 413
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            data = None
+        valid = (
+            isinstance(data, dict)
+            and data.keys() <= SETTINGS_KEYS
+            and all(isinstance(v, dict) for v in data.values())
+        )
+        if not valid:
+            return jsonify({"error": f"Expected an object with sections: {', '.join(sorted(SETTINGS_KEYS))}"}), 400
+        
+        bot_instance.guild_settings.setdefault(guild_id, {}).update(data)
+        bot_instance.save_config()
+        
+        return jsonify({"success": True, "message": "Configuration updated"})
 
 @app.route("/api/server/<int:guild_id>/logs")
 @requires_authorization
 async def api_server_logs(guild_id: int):
     """Get recent logs for a server."""
+    if not await _accessible_guild(guild_id):
+        return jsonify({"error": "Server not found"}), 404
+    
     # This would require storing logs in memory or database
     # For now, return mock data
     logs = [
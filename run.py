@@ -6,6 +6,12 @@ import os
 import asyncio
 from dotenv import load_dotenv
 
+# uvloop is optional (it has no Windows build); fall back to the stock loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 load_dotenv()
 
 async def main():
@@ -16,14 +22,15 @@ async def main():
     # Initialize bot
     bot = ModernBot()
     
-    # Create tasks
-    bot_task = asyncio.create_task(bot.start(TOKEN))
-    dashboard_task = asyncio.create_task(run_dashboard(bot))
-    
-    # Run both concurrently
-    await asyncio.gather(bot_task, dashboard_task)
+    # Run both concurrently; if either one fails, the other is cancelled
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(bot.start(TOKEN))
+        tg.create_task(run_dashboard(bot))
 
 if __name__ == "__main__":
     print("🚀 Starting FbotDiscord with Web Dashboard...")
     print("=" * 50)
-    asyncio.run(main())
+    if uvloop:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -0,0 +1,51 @@
+"""Tests for the dashboard's per-user guild access cache."""
+
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import dashboard
+
+
+class AccessibleGuildTests(unittest.IsolatedAsyncioTestCase):
+    """_accessible_guild must never hand one user's grant to another."""
+
+    GUILD_ID = 1234
+
+    def setUp(self):
+        dashboard._access_cache.clear()
+        self.guild = SimpleNamespace(id=self.GUILD_ID)
+        bot = SimpleNamespace(get_guild=lambda gid: self.guild if gid == self.GUILD_ID else None)
+        patcher = mock.patch.object(dashboard, "bot_instance", bot)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _session(self, user_id: int, guild_ids: list[int]):
+        """Patch the OAuth session to look like user_id, a member of guild_ids."""
+        return mock.patch.multiple(
+            dashboard.discord_oauth,
+            fetch_user=mock.AsyncMock(return_value=SimpleNamespace(id=user_id)),
+            fetch_guilds=mock.AsyncMock(return_value=[SimpleNamespace(id=g) for g in guild_ids]),
+        )
+
+    async def test_grant_is_not_shared_between_sessions(self):
+        # Session users never had session["DISCORD_USER_ID"] set, so user_id is None for both
+        with mock.patch.object(type(dashboard.discord_oauth), "user_id", None):
+            with self._session(1, [self.GUILD_ID]):
+                self.assertIs(await dashboard._accessible_guild(self.GUILD_ID), self.guild)
+            with self._session(2, []):
+                self.assertIsNone(await dashboard._accessible_guild(self.GUILD_ID))
+
+        self.assertIn((1, self.GUILD_ID), dashboard._access_cache)
+        self.assertNotIn((2, self.GUILD_ID), dashboard._access_cache)
+        self.assertNotIn((None, self.GUILD_ID), dashboard._access_cache)
+
+    async def test_cached_grant_skips_guild_fetch(self):
+        with self._session(1, [self.GUILD_ID]):
+            await dashboard._accessible_guild(self.GUILD_ID)
+            await dashboard._accessible_guild(self.GUILD_ID)
+            dashboard.discord_oauth.fetch_guilds.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()